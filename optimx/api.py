@@ -1,3 +1,4 @@
+import asyncio
 import os
 from typing import Any, Dict, List, Optional, Union
 
@@ -8,8 +9,13 @@ from structlog import get_logger
 
 from optimx.core.errors import ModelsNotFound
 from optimx.core.library import LibrarySettings, ModelConfiguration, ModelLibrary
+from optimx.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from optimx.core.metrics import render_metrics
 from optimx.core.model import AbstractModel, AsyncModel
+from optimx.core.models.http_transport import transports_stats
+from optimx.core.profilers.histogram import HistogramProfiler
 from optimx.core.types import LibraryModelsType
+from optimx.utils.micro_batching import AsyncMicroBatcher, MicroBatcher
 import optimx.ext.shellkit as sh
 from optimx.assets.manager import AssetsManager
 from optimx.assets.remote import StorageProvider
@@ -34,7 +40,7 @@ class OptimxAPIRouter(fastapi.APIRouter):
     ) -> None:
         # add custom startup/shutdown events
         on_startup = kwargs.pop("on_startup", [])
-        # on_startup.append(self._on_startup)
+        on_startup.append(self._on_startup)
         kwargs["on_startup"] = on_startup
         on_shutdown = kwargs.pop("on_shutdown", [])
         on_shutdown.append(self._on_shutdown)
@@ -48,8 +54,65 @@ class OptimxAPIRouter(fastapi.APIRouter):
             configuration=configuration,
             models=models,
         )
+        self._async_warmup: Optional[asyncio.Future] = None
+        self.add_api_route(
+            "/ready", self._ready_endpoint, methods=["GET"], include_in_schema=False
+        )
+        if self.lib.settings.metrics:
+            self.add_api_route(
+                "/metrics",
+                self._metrics_endpoint,
+                methods=["GET"],
+                include_in_schema=False,
+            )
+
+    @property
+    def profiler(self) -> Optional[HistogramProfiler]:
+        """Profiler of the models of the library, with the `metrics` setting"""
+        return self.lib.profiler
+
+    def _metrics_endpoint(self):
+        """Exports the metrics of the models in the Prometheus text format"""
+        return fastapi.responses.Response(
+            render_metrics(
+                self.lib.models,
+                self.lib.profiler,
+                self.lib.cache,
+                self.lib.async_cache,
+                transports_stats(),
+            ),
+            media_type=METRICS_CONTENT_TYPE,
+        )
+
+    def _ready_endpoint(self):
+        """Reports unready (503) until the library is loaded and warmed up"""
+        if self.lib.ready and (self._async_warmup is None or self._async_warmup.done()):
+            return {"ready": True}
+        return fastapi.responses.JSONResponse(
+            {
+                "ready": False,
+                "loaded_models": [
+                    name for name, model in self.lib.models.items() if model._loaded
+                ],
+                "failed_models": self.lib.warmup_errors,
+            },
+            status_code=503,
+        )
+
+    async def _on_startup(self):
+        # handlers of included routers may be called more than once
+        if self.lib.settings.warmup and self._async_warmup is None:
+            self._async_warmup = asyncio.ensure_future(self._warmup_async_models())
+
+    async def _warmup_async_models(self):
+        """Warms up the asynchronous models on the serving loop, once the others
+        are"""
+        await asyncio.get_running_loop().run_in_executor(None, self.lib.wait_ready)
+        await self.lib.awarmup()
 
     async def _on_shutdown(self):
+        if self._async_warmup:
+            self._async_warmup.cancel()
         await self.lib.aclose()
 
 
@@ -78,6 +141,7 @@ class OptimxAutoAPIRouter(OptimxAPIRouter):
             **kwargs,
         )
 
+        self.micro_batchers: Dict[str, Union[MicroBatcher, AsyncMicroBatcher]] = {}
         route_paths = route_paths or {}
         for model_name in self.lib.required_models:
             m: AbstractModel = self.lib.get(model_name)
@@ -128,7 +192,21 @@ class OptimxAutoAPIRouter(OptimxAPIRouter):
             )
             logger.info("Added model to service", name=model_name, path=path)
 
+    async def _on_shutdown(self):
+        for batcher in self.micro_batchers.values():
+            if isinstance(batcher, AsyncMicroBatcher):
+                await batcher.close()
+            else:
+                batcher.close()
+        await super()._on_shutdown()
+
     def _make_model_endpoint_fn(self, model, item_type):
+        micro_batching = model.model_settings.get("micro_batching")
+        if micro_batching:
+            return self._make_micro_batched_model_endpoint_fn(
+                model, item_type, {} if micro_batching is True else micro_batching
+            )
+
         if isinstance(model, AsyncModel):
 
             async def _aendpoint(
@@ -147,6 +225,36 @@ class OptimxAutoAPIRouter(OptimxAPIRouter):
 
         return _endpoint
 
+    def _make_micro_batched_model_endpoint_fn(self, model, item_type, micro_batching):
+        """
+        Single item endpoint whose concurrent requests are gathered into
+        batches of up to `max_batch_size` items, waiting at most `max_wait_ms`,
+        each predicted with a single `predict_batch` call.
+        """
+        configuration_key = model.configuration_key
+        if isinstance(model, AsyncModel):
+            async_batcher = AsyncMicroBatcher(
+                lambda items: self.lib.get(configuration_key).predict_batch(items),
+                **micro_batching,
+            )
+            self.micro_batchers[configuration_key] = async_batcher
+
+            async def _aendpoint(item: item_type = fastapi.Body(...)):
+                return await async_batcher.predict(item)
+
+            return _aendpoint
+
+        batcher = MicroBatcher(
+            lambda items: self.lib.get(configuration_key).predict_batch(items),
+            **micro_batching,
+        )
+        self.micro_batchers[configuration_key] = batcher
+
+        async def _endpoint(item: item_type = fastapi.Body(...)):
+            return await asyncio.wrap_future(batcher.submit(item))
+
+        return _endpoint
+
     def _make_batch_model_endpoint_fn(self, model, item_type):
         if isinstance(model, AsyncModel):
 
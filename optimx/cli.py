@@ -5,11 +5,13 @@ import logging
 import multiprocessing
 import os
 import sys
-from time import perf_counter, sleep
+from time import perf_counter
 import time
+from typing import Dict
 
 import click
 import humanize
+import pydantic
 from rich.console import Console
 from rich.markup import escape
 from rich.progress import Progress, track
@@ -44,7 +46,9 @@ optimx_cli.add_command(assets_cli)
 
 def _configure_from_cli_arguments(models, required_models, settings):
     models = list(models) or None
-    required_models = list(required_models) or None
+    if not isinstance(required_models, dict):
+        # a dict also overrides the settings of the models
+        required_models = list(required_models) or None
     if not (models or os.environ.get("OPTIMX_DEFAULT_PACKAGE")):
         raise ModelsNotFound(
             "Please add `your_package` as argument or set the "
@@ -62,46 +66,126 @@ def _configure_from_cli_arguments(models, required_models, settings):
 @optimx_cli.command()
 @click.argument("models", type=str, nargs=-1, required=False)
 @click.option("--required-models", "-r", multiple=True)
-def memory(models, required_models):
+@click.option(
+    "--pid",
+    "pids",
+    type=int,
+    multiple=True,
+    help="Report the shared and private memory of running processes instead",
+)
+@click.option(
+    "--workers-of",
+    type=int,
+    help="Report the shared and private memory of the workers of a master process",
+)
+@click.option(
+    "--tracker",
+    type=click.Choice(["rss", "uss", "tracemalloc"]),
+    default="rss",
+    help="How the memory allocated while loading each model is measured",
+)
+@click.option(
+    "--deep",
+    is_flag=True,
+    help="Also measure the deep size of the objects loaded by each model",
+)
+def memory(models, required_models, pids, workers_of, tracker, deep):
     """
     Show memory consumption of optimx models.
-    """
-    from memory_profiler import memory_usage
 
-    def _load_model(m, service):
-        service._load(m)
-        sleep(1)
+    With `--pid` or `--workers-of`, show how much of the resident memory of
+    running (e.g. pre-forked gunicorn) workers is shared between them.
+    """
+    if pids or workers_of:
+        _processes_memory(list(pids), workers_of)
+        return
 
     service = _configure_from_cli_arguments(
-        models, required_models, {"lazy_loading": True}
+        models,
+        required_models,
+        {
+            "lazy_loading": True,
+            "memory_tracker": tracker,
+            "deep_memory_size": deep,
+        },
     )
-    grand_total = 0
-    stats = {}
     logging.getLogger().setLevel(logging.ERROR)
     if service.required_models:
         with Progress(transient=True) as progress:
-            task = progress.add_task("Profiling memory...", total=len(required_models))
+            task = progress.add_task(
+                "Profiling memory...", total=len(service.required_models)
+            )
             for m in service.required_models:
-                deps = service.configuration[m].model_dependencies
-                deps = deps.values() if isinstance(deps, dict) else deps
-                for dependency in list(deps) + [m]:
-                    mu = memory_usage((_load_model, (dependency, service), {}))
-                    stats[dependency] = mu[-1] - mu[0]
-                    grand_total += mu[-1] - mu[0]
+                # dependencies are loaded, and measured, before the model
+                service.get(m)
                 progress.update(task, advance=1)
+    stats = {
+        name: (model._load_memory_increment or 0, model._load_memory_size)
+        for name, model in service.models.items()
+        if model._loaded
+    }
 
     console = Console()
     table = Table(show_header=True, header_style="bold")
     table.add_column("Model")
     table.add_column("Memory", style="dim")
+    if deep:
+        table.add_column("Size", style="dim")
 
-    for k, (m, mc) in enumerate(stats.items()):
+    for k, (m, (increment, size)) in enumerate(stats.items()):
         table.add_row(
             m,
-            humanize.naturalsize(mc * 10**6, format="%.2f"),
+            humanize.naturalsize(increment, format="%.2f"),
+            *([humanize.naturalsize(size or 0, format="%.2f")] if deep else []),
             end_section=k == len(stats) - 1,
         )
-    table.add_row("Total", humanize.naturalsize(grand_total * 10**6, format="%.2f"))
+    table.add_row(
+        "Total",
+        humanize.naturalsize(sum(x for x, _ in stats.values()), format="%.2f"),
+        *(
+            [
+                humanize.naturalsize(
+                    sum(x or 0 for _, x in stats.values()), format="%.2f"
+                )
+            ]
+            if deep
+            else []
+        ),
+    )
+    console.print(table)
+
+
+def _processes_memory(pids, workers_of):
+    import psutil
+
+    from optimx.utils.memory import process_memory
+
+    if workers_of:
+        pids += [p.pid for p in psutil.Process(workers_of).children()]
+    console = Console()
+    table = Table(show_header=True, header_style="bold")
+    for column in ["PID", "RSS", "Shared", "Private", "PSS"]:
+        table.add_column(column)
+    total = {"rss": 0, "shared": 0, "private": 0, "pss": 0}
+    for pid in pids:
+        info = process_memory(pid)
+        for k in total:
+            total[k] += info[k]
+        table.add_row(
+            str(pid),
+            *(
+                humanize.naturalsize(info[k], format="%.2f")
+                for k in ["rss", "shared", "private", "pss"]
+            ),
+            end_section=pid == pids[-1],
+        )
+    table.add_row(
+        "Total",
+        *(
+            humanize.naturalsize(total[k], format="%.2f")
+            for k in ["rss", "shared", "private", "pss"]
+        ),
+    )
     console.print(table)
 
 
@@ -235,6 +319,64 @@ def time2(model, example, models, n):
     )
 
 
+class BenchCacheKeysItem(pydantic.BaseModel):
+    name: str
+    values: Dict[str, float]
+
+
+@optimx_cli.command("bench-cache-keys")
+@click.option("--n", "-n", default=1000)
+@click.option("--size", default=100, help="Number of fields of benchmarked items.")
+def bench_cache_keys(n, size):
+    """
+    Benchmark cache key builders.
+
+    Time n cache key computations with each key builder on typical items,
+    the `pickle` builder being the historical pickle + sha256 path.
+    """
+    from optimx.utils.cache_keys import KEY_BUILDERS, make_key_builder
+
+    items = {
+        "str": "x" * size,
+        "dict": {f"field_{k}": float(k) for k in range(size)},
+        "nested": {
+            f"field_{k}": {"values": list(range(10)), "name": str(k)}
+            for k in range(size)
+        },
+        "pydantic": BenchCacheKeysItem(
+            name="item", values={f"field_{k}": float(k) for k in range(size)}
+        ),
+    }
+    try:
+        import numpy as np
+
+        items["numpy"] = np.random.rand(size, 64)
+    except ModuleNotFoundError:  # pragma: no cover
+        pass
+
+    builders = {}
+    for name in KEY_BUILDERS:
+        try:
+            builders[name] = make_key_builder(name)
+        except ImportError:
+            pass
+
+    console = Console()
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Item")
+    for name in builders:
+        table.add_column(f"{name} (µs/key)", justify="right")
+    for item_name, item in items.items():
+        row = [item_name]
+        for builder in builders.values():
+            t0 = perf_counter()
+            for _ in range(n):
+                builder.hash(b"model", item, {})
+            row.append(f"{(perf_counter() - t0) / n * 1e6:.2f}")
+        table.add_row(*row)
+    console.print(table)
+
+
 @optimx_cli.command("serve")
 @click.argument("models", type=str, nargs=-1, required=False)
 @click.option("--required-models", "-r", type=str, multiple=True)
@@ -356,10 +498,47 @@ def reader(input, queues):
 @click.option("--models", type=str, multiple=True)
 @click.option("--processes", type=int, default=None)
 @click.option("--unordered", is_flag=True)
-def batch_predict(model_name, input, output, models, processes, unordered):
+@click.option(
+    "--executor",
+    type=click.Choice(["thread", "process"]),
+    default=None,
+    help="Shard the batches of a single loaded model across a pool instead",
+)
+@click.option("--workers", type=int, default=None)
+@click.option("--batch-size", type=int, default=None)
+def batch_predict(
+    model_name,
+    input,
+    output,
+    models,
+    processes,
+    unordered,
+    executor,
+    workers,
+    batch_size,
+):
     """
     Barch predictions for a given model.
     """
+    if executor:
+        lib = _configure_from_cli_arguments(
+            models,
+            {model_name: {"executor": executor, "workers": workers}},
+            {"lazy_loading": True},
+        )
+        model = lib.get(model_name)
+        n = 0
+        with open(input) as f_in, open(output, "w") as f_out:
+            for res in model.predict_gen(
+                (json.loads(line.strip()) for line in f_in),
+                batch_size=batch_size or model.batch_size or 64,
+            ):
+                f_out.write(json.dumps(res) + "\n")
+                n += 1
+        model.close()
+        print(f"Total: {n} elements")
+        return
+
     processes = processes or os.cpu_count()
     print(f"Using {processes} processes")
     lib = _configure_from_cli_arguments(models, [model_name], {"lazy_loading": True})
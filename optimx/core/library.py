@@ -5,10 +5,15 @@ Ask for model using get. Handle loading, refresh...
 """
 
 import collections
+import concurrent.futures
+import gc
 import os
 import re
+import threading
+import time
 from typing import (
     Any,
+    DefaultDict,
     Dict,
     List,
     Mapping,
@@ -33,11 +38,31 @@ import optimx.assets
 from optimx.assets.manager import AssetsManager
 from optimx.assets.settings import AssetSpec
 from optimx.core import errors
-from optimx.core.model import Asset, AsyncModel, Model
+from optimx.core.model import (
+    AbstractModel,
+    Asset,
+    AsyncModel,
+    Model,
+    WrappedAsyncModel,
+)
 from optimx.core.model_configuration import ModelConfiguration, configure, list_assets
-from optimx.core.settings import LibrarySettings, NativeCacheSettings, RedisSettings
+from optimx.core.profilers.histogram import HistogramProfiler
+from optimx.core.settings import (
+    LibrarySettings,
+    NativeCacheSettings,
+    RedisSettings,
+    TieredCacheSettings,
+)
 from optimx.core.types import LibraryModelsType
-from optimx.utils.cache import Cache, NativeCache, RedisCache
+from optimx.utils.cache import (
+    AsyncCache,
+    AsyncRedisCache,
+    AsyncTieredCache,
+    Cache,
+    NativeCache,
+    RedisCache,
+    TieredCache,
+)
 from optimx.utils.memory import PerformanceTracker
 from optimx.utils.pretty import describe
 from optimx.utils.redis import RedisCacheException
@@ -56,7 +81,13 @@ T = TypeVar("T", bound=Model)
 
 class AssetInfo(pydantic.BaseModel):
     path: str
-    version: Optional[str]
+    version: Optional[str] = None
+
+
+class ModelLoadTiming(pydantic.BaseModel):
+    asset_time: float = 0
+    load_time: float = 0
+    wave: Optional[int] = None
 
 
 class ModelLibrary:
@@ -93,6 +124,10 @@ class ModelLibrary:
         )
         self.models: Dict[str, Asset] = {}
         self.assets_info: Dict[str, AssetInfo] = {}
+        # Assets replaced by local files or by the override assets manager
+        self._overridden_assets: Set[str] = set()
+        # Time spent resolving the asset and instantiating each model
+        self.load_timings: Dict[str, ModelLoadTiming] = {}
         self._assets_manager: Optional[AssetsManager] = None
 
         required_models = (
@@ -104,11 +139,15 @@ class ModelLibrary:
             required_models = {r: {} for r in required_models}
         self.required_models: Dict[str, Dict[str, Any]] = required_models
         self.cache: Optional[Cache] = None
+        # Cache handed to `AsyncModel`s, whose calls do not block the event loop
+        self.async_cache: Optional[AsyncCache] = None
         if self.settings.cache:
             if isinstance(self.settings.cache, RedisSettings):
                 try:
-                    self.cache = RedisCache(
-                        self.settings.cache.host, self.settings.cache.port
+                    redis_cache = RedisCache(
+                        self.settings.cache.host,
+                        self.settings.cache.port,
+                        key_builder=self.settings.cache.key_builder,
                     )
                 except (ConnectionError, redis.ConnectionError) as e:
                     logger.error(
@@ -121,14 +160,75 @@ class ModelLibrary:
                         f"[cache_host={self.settings.cache.host}, "
                         f"port={self.settings.cache.port}]"
                     ) from e
+                self.cache = redis_cache
+                if isinstance(self.settings.cache, TieredCacheSettings):
+                    self.cache = TieredCache(
+                        NativeCache(
+                            "LRU",
+                            self.settings.cache.l1_maxsize,
+                            ttl=self.settings.cache.l1_ttl,
+                        ),
+                        redis_cache,
+                        key_builder=self.settings.cache.key_builder,
+                    )
+                self.async_cache = AsyncRedisCache(
+                    self.settings.cache.host,
+                    self.settings.cache.port,
+                    max_connections=self.settings.cache.max_connections,
+                    key_builder=self.settings.cache.key_builder,
+                )
+                if isinstance(self.settings.cache, TieredCacheSettings):
+                    # the L1 of synchronous models is used from their threads,
+                    # asynchronous models get their own
+                    self.async_cache = AsyncTieredCache(
+                        NativeCache(
+                            "LRU",
+                            self.settings.cache.l1_maxsize,
+                            ttl=self.settings.cache.l1_ttl,
+                        ),
+                        self.async_cache,
+                        key_builder=self.settings.cache.key_builder,
+                    )
             if isinstance(self.settings.cache, NativeCacheSettings):
                 self.cache = NativeCache(
-                    self.settings.cache.implementation, self.settings.cache.maxsize
+                    self.settings.cache.implementation,
+                    self.settings.cache.maxsize,
+                    key_builder=self.settings.cache.key_builder,
+                    ttl=self.settings.cache.ttl,
+                    max_bytes=self.settings.cache.max_bytes,
                 )
 
+        # Serializes lazy loads between requests and the warm-up thread
+        self._load_lock = threading.RLock()
+        # Profiler of all the models, with the `metrics` setting
+        self.profiler: Optional[HistogramProfiler] = None
+        # Set once the warm-up is over, whether models failed to load or not
+        self._ready = threading.Event()
+        self.warmup_errors: Dict[str, str] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+        # Reloads run one at a time, in the background
+        self._reload_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="optimx-reload"
+        )
+        # Versions of the reloads queued for each model, guarded by `_load_lock`
+        self._pending_reloads: DefaultDict[str, List[Optional[str]]] = (
+            collections.defaultdict(list)
+        )
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
         if not self._lazy_loading:
             self.preload()
 
+        if self.settings.warmup:
+            self._warmup_thread = threading.Thread(target=self.warmup, daemon=True)
+            self._warmup_thread.start()
+        else:
+            self._ready.set()
+
+        if self.settings.assets_watch_interval:
+            self.watch_assets(self.settings.assets_watch_interval)
+
     @property
     def assets_manager(self):
         if self._assets_manager is None:
@@ -160,14 +260,17 @@ class ModelLibrary:
         :return: required model
         """
 
-        if self._lazy_loading:
-            # When in lazy mode ensure the model object and its dependencies
-            # are instantiated, this will download the asset
-            if name not in self.models:
-                self._load(name)
-            # Ensure that it is loaded
-            if not self.models[name]._loaded:
-                self.models[name].load()
+        if self._lazy_loading and not (
+            name in self.models and self.models[name]._loaded
+        ):
+            with self._load_lock:
+                # When in lazy mode ensure the model object and its dependencies
+                # are instantiated, this will download the asset
+                if name not in self.models:
+                    self._load(name)
+                # Ensure that it is loaded
+                if not self.models[name]._loaded:
+                    self.models[name].load()
 
         if name not in self.models:
             raise errors.ModelsNotFound(
@@ -188,7 +291,7 @@ class ModelLibrary:
         This function loads a configured model by name.
         """
 
-        with PerformanceTracker() as m:
+        with PerformanceTracker(self.settings.memory_tracker) as m:
             self._check_configurations(model_name)
             self._resolve_assets(model_name)
             self._load_model(model_name)
@@ -253,32 +356,78 @@ class ModelLibrary:
                 self._load_model(dep_name)
             model_dependencies[dep_ref_name] = self.models[dep_name]
 
+        start = time.perf_counter()
+        self.models[model_name] = self._instantiate_model(
+            model_name,
+            model_dependencies,
+            (
+                self.assets_info[configuration.asset].path
+                if configuration.asset
+                else None
+            ),
+        )
+        self._timing(model_name).load_time = time.perf_counter() - start
+        logger.debug("Done loading Model", model_name=model_name)
+
+    def _instantiate_model(
+        self,
+        model_name: str,
+        model_dependencies: Dict[str, Asset],
+        asset_path: Optional[str],
+    ) -> Asset:
+        configuration = self.configuration[model_name]
         model_settings = {
             **configuration.model_settings,
             **self.required_models.get(model_name, {}),
         }
 
         logger.debug("Instantiating Model object", model_name=model_name)
-        self.env = configuration.env
-        if not self.env:
-            self.env = "dev"
+        # models may be loaded concurrently, do not read back `self.env`
+        env = configuration.env or "dev"
+        self.env = env
 
         config = Config()
         base_model_path = config.get_base_model_path()
-        base_asset_path = os.path.join(base_model_path, self.env, model_name)
-        self.models[model_name] = configuration.model_type(
-            asset_path=(
-                self.assets_info[configuration.asset].path
-                if configuration.asset
-                else base_asset_path
-            ),
+        base_asset_path = os.path.join(base_model_path, env, model_name)
+        model = configuration.model_type(
+            asset_path=asset_path or base_asset_path,
             model_dependencies=model_dependencies,
             service_settings=self.settings,
             model_settings=model_settings or {},
             configuration_key=model_name,
-            cache=self.cache,
+            cache=(
+                self.async_cache
+                if self.async_cache and issubclass(configuration.model_type, AsyncModel)
+                else self.cache
+            ),
         )
-        logger.debug("Done loading Model", model_name=model_name)
+        for dep_ref_name, dep_name in configuration.model_dependencies.items():
+            dependency = model_dependencies.get(dep_ref_name)
+            if isinstance(dependency, WrappedAsyncModel):
+                # loading the model wraps its asynchronous dependencies in place
+                dependency = dependency.async_model
+            if dependency is not None and dependency._cache_model_key not in (
+                None,
+                dep_name,
+            ):
+                # the dependency was reloaded, do not serve predictions made with
+                # its previous versions
+                model._set_dependency_cache_version(
+                    dep_name, cast(str, dependency._cache_model_key)
+                )
+        self._profile(model)
+        return model
+
+    def _profile(self, model: Asset):
+        """Records the metrics of the model from its first prediction, when they
+        are exported"""
+        if not self.settings.metrics or not isinstance(model, AbstractModel):
+            return
+        with self._load_lock:
+            if self.profiler is None:
+                self.profiler = HistogramProfiler(model)
+            else:
+                self.profiler._build(model)
 
     def _resolve_assets(self, model_name):
         """
@@ -291,6 +440,16 @@ class ModelLibrary:
         for dep_name in configuration.model_dependencies.values():
             self._resolve_assets(dep_name)
 
+        start = time.perf_counter()
+        self._resolve_model_asset(model_name)
+        self._timing(model_name).asset_time += time.perf_counter() - start
+
+    def _resolve_model_asset(self, model_name):
+        """
+        This function fetches the asset of the current model only, and populates
+        the assets_info dictionary with its path.
+        """
+        configuration = self.configuration[model_name]
         if not configuration.asset:
             # If the model has no asset to load
             return
@@ -309,6 +468,7 @@ class ModelLibrary:
                 asset_path=asset_path,
             )
             self.assets_info[configuration.asset] = AssetInfo(path=asset_path)
+            self._overridden_assets.add(configuration.asset)
 
         asset_spec = AssetSpec.from_string(configuration.asset)
 
@@ -324,20 +484,11 @@ class ModelLibrary:
                 path=local_file,
             )
             self.assets_info[configuration.asset] = AssetInfo(path=local_file)
+            self._overridden_assets.add(configuration.asset)
 
         # The assets should be retrieved
         # possibly override version
-        venv = "OPTIMX_{}_VERSION".format(
-            re.sub(r"[\/\-\.]+", "_", asset_spec.name).upper()
-        )
-        version = os.environ.get(venv)
-        if version:
-            logger.debug(
-                "Overriding asset version from environment variable",
-                asset_name=asset_spec.name,
-                path=local_file,
-            )
-            asset_spec = AssetSpec.from_string(asset_spec.name + ":" + version)
+        asset_spec = self._asset_spec(configuration.asset)
 
         if self.override_assets_manager:
             try:
@@ -349,6 +500,7 @@ class ModelLibrary:
                         return_info=True,
                     )
                 )
+                self._overridden_assets.add(configuration.asset)
                 logger.debug(
                     "Asset has been overriden",
                     name=asset_spec.name,
@@ -364,13 +516,423 @@ class ModelLibrary:
                 **self.assets_manager.fetch_asset(asset_spec, return_info=True)
             )
 
+    def _asset_spec(self, asset: str) -> AssetSpec:
+        """Spec of a configured asset, whose version may be overriden with the
+        `OPTIMX_<NAME>_VERSION` environment variable"""
+        asset_spec = AssetSpec.from_string(asset)
+        venv = "OPTIMX_{}_VERSION".format(
+            re.sub(r"[\/\-\.]+", "_", asset_spec.name).upper()
+        )
+        version = os.environ.get(venv)
+        if version:
+            logger.debug(
+                "Overriding asset version from environment variable",
+                asset_name=asset_spec.name,
+                version=version,
+            )
+            asset_spec = AssetSpec.from_string(asset_spec.name + ":" + version)
+        return asset_spec
+
+    def _timing(self, model_name) -> ModelLoadTiming:
+        if model_name not in self.load_timings:
+            self.load_timings[model_name] = ModelLoadTiming()
+        return self.load_timings[model_name]
+
+    def _dependency_waves(self, model_names) -> List[List[str]]:
+        """
+        Sorts the models and all their dependencies in waves, such that the
+        dependencies of the models of a wave all belong to previous waves.
+        """
+        depths: Dict[str, int] = {}
+
+        def _depth(model_name):
+            if model_name not in depths:
+                dependencies = self.configuration[model_name].model_dependencies
+                depths[model_name] = 1 + max(
+                    (_depth(dep_name) for dep_name in dependencies.values()),
+                    default=-1,
+                )
+            return depths[model_name]
+
+        for model_name in model_names:
+            _depth(model_name)
+        waves: List[List[str]] = [
+            [] for _ in range(max(depths.values(), default=-1) + 1)
+        ]
+        for model_name, depth in depths.items():
+            waves[depth].append(model_name)
+        return waves
+
+    def _parallel_preload(self, workers: int):
+        """
+        Fetches the assets of all models concurrently, then instantiates the
+        models in dependency waves, the models of a wave concurrently.
+        """
+        for model_name in self.required_models:
+            self._check_configurations(model_name)
+        waves = self._dependency_waves(self.required_models)
+
+        # models sharing an asset resolve it sequentially
+        models_by_asset: Dict[str, List[str]] = collections.defaultdict(list)
+        for i, wave in enumerate(waves):
+            for model_name in wave:
+                self._timing(model_name).wave = i
+                asset = self.configuration[model_name].asset
+                if asset:
+                    models_by_asset[asset].append(model_name)
+
+        def _resolve(model_names):
+            for model_name in model_names:
+                start = time.perf_counter()
+                self._resolve_model_asset(model_name)
+                self._timing(model_name).asset_time += time.perf_counter() - start
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [
+                executor.submit(_resolve, model_names)
+                for model_names in models_by_asset.values()
+            ]:
+                future.result()
+            for i, wave in enumerate(waves):
+                logger.debug("Loading models", wave=i, models=wave)
+                for future in [
+                    executor.submit(self._load_model, model_name) for model_name in wave
+                ]:
+                    future.result()
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        The chain of model dependencies that took the longest to resolve and
+        load, and its total time in seconds.
+        """
+        paths: Dict[str, Tuple[List[str], float]] = {}
+
+        def _path(model_name):
+            if model_name not in paths:
+                timing = self.load_timings.get(model_name, ModelLoadTiming())
+                dependencies = self.configuration[model_name].model_dependencies
+                dep_path, dep_time = max(
+                    (_path(dep_name) for dep_name in dependencies.values()),
+                    key=lambda x: x[1],
+                    default=([], 0.0),
+                )
+                paths[model_name] = (
+                    dep_path + [model_name],
+                    dep_time + timing.asset_time + timing.load_time,
+                )
+            return paths[model_name]
+
+        return max(
+            (_path(model_name) for model_name in self.load_timings),
+            key=lambda x: x[1],
+            default=([], 0.0),
+        )
+
     def preload(self):
         # make sure the assets_manager is instantiated
         _ = self.assets_manager
+        with PerformanceTracker(self.settings.memory_tracker) as m:
+            if self.settings.preload_workers > 1:
+                self._parallel_preload(self.settings.preload_workers)
+            else:
+                for model_name in self.required_models:
+                    self._load(model_name)
+        if self.settings.gc_freeze:
+            # Move the loaded objects to the permanent generation, so that the
+            # collector does not write to their pages in pre-forked workers
+            gc.collect()
+            gc.freeze()
+        path, path_time = self.critical_path()
+        logger.info(
+            "Models preloaded",
+            n_models=len(self.models),
+            workers=self.settings.preload_workers,
+            time_s=m.time,
+            memory=(
+                humanize.naturalsize(m.increment) if m.increment is not None else None
+            ),
+            memory_bytes=m.increment,
+            critical_path=path,
+            critical_path_s=path_time,
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Whether all the required models are loaded and warmed up"""
+        return self._ready.is_set() and not self.warmup_errors
+
+    @property
+    def failed(self) -> bool:
+        """Whether the warm-up is over and some required models failed to load"""
+        return self._ready.is_set() and bool(self.warmup_errors)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout) and not self.warmup_errors
+
+    def warmup(self):
+        """
+        Loads all the required models, and runs the test cases of the `Model`s
+        as warm-up predictions. Started in a background thread when `warmup` is
+        set.
+
+        `AsyncModel`s are warmed up by `awarmup`, on the event loop serving them,
+        since the resources they create are bound to it.
+        """
+        start = time.perf_counter()
         for model_name in self.required_models:
-            self._load(model_name)
+            try:
+                model = self.get(model_name)
+            except Exception as exc:
+                logger.exception("Cannot load model during warm-up", name=model_name)
+                self.warmup_errors[model_name] = repr(exc)
+                continue
+            if isinstance(model, Model):
+                self._warmup_model(model)
+        self._ready.set()
+        logger.info(
+            "Models warmed up",
+            time_s=time.perf_counter() - start,
+            failed_models=list(self.warmup_errors),
+        )
+
+    async def awarmup(self):
+        """Runs the test cases of the loaded `AsyncModel`s on the running loop"""
+        for model in list(self.models.values()):
+            if isinstance(model, AsyncModel):
+                for _, item, _, keyword_args in model._iterate_test_cases(
+                    model_key=model.configuration_key
+                ):
+                    try:
+                        await model.predict(item, **keyword_args)
+                    except Exception:
+                        logger.warning(
+                            "Warm-up prediction failed",
+                            name=model.configuration_key,
+                            exc_info=True,
+                        )
+
+    @staticmethod
+    def _warmup_model(model: Model):
+        for _, item, _, keyword_args in model._iterate_test_cases(
+            model_key=model.configuration_key
+        ):
+            try:
+                model.predict(item, **keyword_args)
+            except Exception:
+                logger.warning(
+                    "Warm-up prediction failed",
+                    name=model.configuration_key,
+                    exc_info=True,
+                )
+
+    def reload(
+        self, model_name: str, version: Optional[str] = None
+    ) -> "concurrent.futures.Future[Asset]":
+        """
+        Fetches the asset of a model, in the given version or the latest one
+        matching its configuration, and loads a fresh instance in the background.
+
+        The new instance is swapped in, also in the models depending on it, once
+        it is loaded. Predictions in flight finish on the previous instance.
+        """
+        self._check_configurations(model_name)
+        with self._load_lock:
+            self._pending_reloads[model_name].append(version)
+        return self._reload_executor.submit(self._reload, model_name, version)
+
+    def _reload(self, model_name: str, version: Optional[str]) -> Asset:
+        start = time.perf_counter()
+        configuration = self.configuration[model_name]
+        try:
+            asset_info = None
+            if configuration.asset:
+                asset_spec: Optional[AssetSpec] = None
+                if version:
+                    configured_spec = AssetSpec.from_string(configuration.asset)
+                    asset_spec = AssetSpec(
+                        name=configured_spec.name,
+                        version=version,
+                        sub_part=configured_spec.sub_part,
+                    )
+                elif configuration.asset not in self._overridden_assets:
+                    asset_spec = self._asset_spec(configuration.asset)
+                # otherwise the overriding files are loaded again
+                asset_info = (
+                    AssetInfo(
+                        **self.assets_manager.fetch_asset(asset_spec, return_info=True)
+                    )
+                    if asset_spec
+                    else self.assets_info[configuration.asset]
+                )
+            model = self._instantiate_model(
+                model_name,
+                {
+                    dep_ref_name: self.get(dep_name)
+                    for dep_ref_name, dep_name in (
+                        configuration.model_dependencies.items()
+                    )
+                },
+                asset_info.path if asset_info else None,
+            )
+            if asset_info and asset_info.version:
+                # predictions of the previous version must not be served anymore
+                model._set_cache_version(asset_info.version)
+            if not model._loaded:
+                model.load()
+            if self.settings.warmup and isinstance(model, Model):
+                self._warmup_model(model)
+            profiler = getattr(self.models.get(model_name), "profiler", None)
+            if profiler:
+                # the new instance is profiled along with the previous one
+                profiler._build(model)
+        except Exception:
+            logger.exception("Cannot reload model", name=model_name, version=version)
+            raise
+        finally:
+            with self._load_lock:
+                self._pending_reloads[model_name].remove(version)
+
+        with self._load_lock:
+            if asset_info:
+                self.assets_info[cast(str, configuration.asset)] = asset_info
+                if version:
+                    # the asset is fetched from the storage from now on
+                    self._overridden_assets.discard(cast(str, configuration.asset))
+            previous = self.models.get(model_name)
+            self.models[model_name] = model
+            for dependent_name, dependent in list(self.models.items()):
+                dependencies = self.configuration[dependent_name].model_dependencies
+                for dep_ref_name, dep_name in dependencies.items():
+                    if (
+                        dep_name != model_name
+                        or dep_ref_name not in dependent.model_dependencies
+                    ):
+                        continue
+                    if isinstance(
+                        dependent.model_dependencies[dep_ref_name], WrappedAsyncModel
+                    ):
+                        dependent.model_dependencies[dep_ref_name] = WrappedAsyncModel(
+                            model
+                        )
+                    else:
+                        dependent.model_dependencies[dep_ref_name] = model
+            self._invalidate_dependents_cache(model_name)
+        if previous is not None and previous is not model:
+            self._close_when_idle(previous)
+        logger.info(
+            "Model reloaded",
+            name=model_name,
+            version=asset_info.version if asset_info else None,
+            time_s=time.perf_counter() - start,
+        )
+        return model
+
+    def _invalidate_dependents_cache(self, model_name: str):
+        """Moves the loaded models depending, even indirectly, on a reloaded
+        model to new cache keys"""
+        names = collections.deque([model_name])
+        while names:
+            name = names.popleft()
+            cache_model_key = self.models[name]._cache_model_key
+            if cache_model_key is None:
+                continue
+            for dependent_name, dependent in self.models.items():
+                dependencies = self.configuration[dependent_name].model_dependencies
+                if name in dependencies.values():
+                    dependent._set_dependency_cache_version(name, cache_model_key)
+                    names.append(dependent_name)
+
+    def _close_when_idle(self, model: Asset):
+        """Closes a replaced model instance once its predictions are over"""
+
+        def _close():
+            while model._in_flight:
+                time.sleep(0.1)
+            try:
+                if isinstance(model, Model):
+                    model.close()
+                elif isinstance(model, AsyncModel):
+                    AsyncToSync(model.close)()
+            except Exception:
+                logger.warning(
+                    "Cannot close replaced model",
+                    name=model.configuration_key,
+                    exc_info=True,
+                )
+
+        threading.Thread(
+            target=_close, name="optimx-close-replaced", daemon=True
+        ).start()
+
+    def check_assets_updates(self) -> List["concurrent.futures.Future[Asset]"]:
+        """
+        Reloads the loaded models whose assets have a new version on the remote
+        storage. Assets pinned to a complete version, in the configuration or
+        with `OPTIMX_<NAME>_VERSION`, and overridden assets are not checked.
+        """
+        storage_provider = self.assets_manager.storage_provider
+        if not storage_provider:
+            return []
+        remote_versions: Dict[str, List[str]] = {}
+        futures = []
+        for model_name in list(self.models):
+            configuration = self.configuration[model_name]
+            if (
+                not configuration.asset
+                or configuration.asset not in self.assets_info
+                or configuration.asset in self._overridden_assets
+            ):
+                continue
+            asset_spec = self._asset_spec(configuration.asset)
+            if asset_spec.is_version_complete():
+                continue
+            if asset_spec.name not in remote_versions:
+                remote_versions[asset_spec.name] = storage_provider.get_versions_info(
+                    asset_spec.name
+                )
+            if not remote_versions[asset_spec.name]:
+                continue
+            asset_spec.set_latest_version(
+                asset_spec.sort_versions(remote_versions[asset_spec.name])
+            )
+            with self._load_lock:
+                pending_versions = list(self._pending_reloads[model_name])
+            if (
+                asset_spec.version == self.assets_info[configuration.asset].version
+                or asset_spec.version in pending_versions
+            ):
+                continue
+            logger.info(
+                "New asset version", name=model_name, version=asset_spec.version
+            )
+            futures.append(self.reload(model_name, asset_spec.version))
+        return futures
+
+    def watch_assets(self, interval_s: float):
+        """Checks for new asset versions every `interval_s` in a background thread"""
+        if self._watcher_thread:
+            return
+        self._watcher_stop.clear()
+
+        def _watch():
+            while not self._watcher_stop.wait(interval_s):
+                try:
+                    self.check_assets_updates()
+                except Exception:
+                    logger.exception("Cannot check for assets updates")
+
+        self._watcher_thread = threading.Thread(target=_watch, daemon=True)
+        self._watcher_thread.start()
+
+    def _stop_reloads(self):
+        if self._watcher_thread:
+            self._watcher_stop.set()
+            self._watcher_thread.join()
+            self._watcher_thread = None
+        self._reload_executor.shutdown(wait=True)
 
     def close(self):
+        self._stop_reloads()
         for model in self.models.values():
             if isinstance(model, Model):
                 model.close()
@@ -378,11 +940,14 @@ class ModelLibrary:
                 AsyncToSync(model.close)()
 
     async def aclose(self):
+        self._stop_reloads()
         for model in self.models.values():
             if isinstance(model, Model):
                 model.close()
             if isinstance(model, AsyncModel):
                 await model.close()
+        if self.async_cache:
+            await self.async_cache.close()
 
     def describe(self, console=None) -> None:
         if not console:
@@ -397,6 +962,12 @@ class ModelLibrary:
         else:
             describe(self.assets_info, t=t)
         console.print(t)
+        t = Tree("[bold]Cache")
+        if not self.cache:
+            t.add("[dim][italic]No cache")
+        else:
+            describe(self.cache, t=t)
+        console.print(t)
         t = Tree("[bold]Models")
         if not self.models:
             t.add("[dim][italic]No models loaded")
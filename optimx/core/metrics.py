@@ -0,0 +1,224 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from optimx.core.model import WrappedAsyncModel
+from optimx.core.profilers.histogram import HistogramProfiler
+from optimx.utils.cache import AsyncCache, Cache
+from optimx.utils.histogram import Histogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS_S = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+# cache stats only growing over time, the others are gauges
+CACHE_COUNTERS = ("hits", "misses", "evictions", "expirations")
+CACHE_TIERS = ("l1", "l2")
+# connections of the HTTP transports of the distant models
+TRANSPORT_COUNTERS = {
+    "requests": "Requests sent by the distant models",
+    "connections": "Connections opened by the distant models",
+    "reused_connections": "Requests of the distant models on a reused connection",
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+class MetricsWriter:
+    """Writes metrics in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(
+        self,
+        name: str,
+        kind: str,
+        description: str,
+        samples: Iterable[Tuple[Dict[str, str], float]],
+    ):
+        self.lines.append(f"# HELP {name} {description}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {value}")
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        histograms: Dict[str, Histogram],
+        bounds: Tuple[float, ...],
+        scale: float = 1,
+    ):
+        """Exports `Histogram`s of integers, whose values are multiplied by
+        `scale`, with cumulative counts below each of the `bounds`"""
+        self.lines.append(f"# HELP {name} {description}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for model, histogram in histograms.items():
+            counts = histogram.cumulative_counts(
+                [round(bound / scale) for bound in bounds]
+            )
+            for bound, count in zip(bounds, counts):
+                labels = _labels({"model": model, "le": str(bound)})
+                self.lines.append(f"{name}_bucket{labels} {count}")
+            labels = _labels({"model": model, "le": "+Inf"})
+            self.lines.append(f"{name}_bucket{labels} {histogram.count}")
+            labels = _labels({"model": model})
+            self.lines.append(f"{name}_sum{labels} {histogram.total * scale}")
+            self.lines.append(f"{name}_count{labels} {histogram.count}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(
+    models: Dict[str, object],
+    profiler: Optional[HistogramProfiler] = None,
+    cache: Optional[Cache] = None,
+    async_cache: Optional[AsyncCache] = None,
+    transports: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> str:
+    """
+    Metrics of the served models, labelled by configuration key: predictions
+    latency, batch sizes, cache hits and validation errors recorded by the
+    profiler, load times of the models, counters of the caches of the
+    synchronous and asynchronous models, and connection reuse of the HTTP
+    transports of distant models, as returned by `transports_stats`.
+    """
+    writer = MetricsWriter()
+    if profiler:
+        stats = dict(sorted(profiler.stats.items()))
+        writer.histogram(
+            "optimx_model_predict_duration_seconds",
+            "Duration of the model predictions",
+            {model: s.latency for model, s in stats.items()},
+            LATENCY_BUCKETS_S,
+            scale=1e-6,
+        )
+        writer.histogram(
+            "optimx_model_batch_size",
+            "Number of items computed by each batch",
+            {model: s.batch_size for model, s in stats.items()},
+            BATCH_SIZE_BUCKETS,
+        )
+        writer.metric(
+            "optimx_model_cache_hits_total",
+            "counter",
+            "Predictions read from the cache",
+            (({"model": model}, s.cache_hits) for model, s in stats.items()),
+        )
+        writer.metric(
+            "optimx_model_cache_misses_total",
+            "counter",
+            "Predictions looked up and not found in the cache",
+            (
+                ({"model": model}, s.cache_lookups - s.cache_hits)
+                for model, s in stats.items()
+            ),
+        )
+        writer.metric(
+            "optimx_model_validation_errors_total",
+            "counter",
+            "Items or predictions failing validation",
+            (
+                ({"model": model, "error": error}, count)
+                for model, s in stats.items()
+                for error, count in sorted(s.validation_errors.items())
+            ),
+        )
+    loaded = {}
+    for name, model in sorted(models.items()):
+        if isinstance(model, WrappedAsyncModel):
+            model = model.async_model
+        if getattr(model, "_loaded", False):
+            loaded[name] = model
+    writer.metric(
+        "optimx_model_load_time_seconds",
+        "gauge",
+        "Time spent loading the model",
+        (
+            ({"model": name}, model._load_time)
+            for name, model in loaded.items()
+            if model._load_time is not None
+        ),
+    )
+    writer.metric(
+        "optimx_model_load_memory_bytes",
+        "gauge",
+        "Memory allocated while loading the model",
+        (
+            ({"model": name}, model._load_memory_increment)
+            for name, model in loaded.items()
+            if model._load_memory_increment is not None
+        ),
+    )
+    samples: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    # the cache of synchronous models, and the one of asynchronous models
+    for kind, c in (("sync", cache), ("async", async_cache)):
+        stats = getattr(c, "stats", None)
+        if stats is None:
+            continue
+        for stat, labels, value in _cache_stats(stats(), {"cache": kind}):
+            samples.setdefault(stat, []).append((labels, value))
+    if samples:
+        for stat, stat_samples in samples.items():
+            if stat in CACHE_COUNTERS:
+                writer.metric(
+                    f"optimx_cache_{stat}_total",
+                    "counter",
+                    f"Cache {stat}",
+                    stat_samples,
+                )
+            else:
+                writer.metric(
+                    f"optimx_cache_{stat}", "gauge", f"Cache {stat}", stat_samples
+                )
+    if transports:
+        for stat, description in TRANSPORT_COUNTERS.items():
+            writer.metric(
+                f"optimx_http_transport_{stat}_total",
+                "counter",
+                description,
+                (
+                    ({"transport": transport}, stats[stat])
+                    for transport, stats in sorted(transports.items())
+                ),
+            )
+    return writer.render()
+
+
+def _cache_stats(
+    stats: Dict[str, Any], labels: Dict[str, str]
+) -> Iterator[Tuple[str, Dict[str, str], float]]:
+    """Numeric cache stats, with a `tier` label for the levels of a tiered cache,
+    whether nested (`l1`) or prefixed (`l2_hits`)"""
+    for stat, value in stats.items():
+        if isinstance(value, dict):
+            yield from _cache_stats(value, {**labels, "tier": stat})
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            tier, _, tier_stat = stat.partition("_")
+            if tier in CACHE_TIERS and tier_stat:
+                yield tier_stat, {**labels, "tier": tier}, value
+            else:
+                yield stat, labels, value
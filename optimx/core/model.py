@@ -1,10 +1,14 @@
 import abc
+import asyncio
 import copy
 import datetime as dt
 import enum
 import functools
+import itertools
+import os
+import threading
 import typing
-from contextlib import ExitStack
+from contextlib import ExitStack, nullcontext
 from typing import (
     Any,
     AsyncIterator,
@@ -33,13 +37,21 @@ from typing_extensions import Protocol
 from optimx.core import errors
 from optimx.core.settings import LibrarySettings
 from optimx.core.types import ItemType, ReturnType, TestCase
-from optimx.utils.cache import Cache, CacheItem
-from optimx.utils.memory import PerformanceTracker
+from optimx.utils.async_bridge import iterate_async_gen, run_sync
+from optimx.utils.cache import AsyncCache, Cache, CacheItem, CacheKeyMixin
+from optimx.utils.executors import BatchExecutor
+from optimx.utils.memory import PerformanceTracker, deep_getsizeof
+from optimx.utils.mmap_assets import load_array, load_arrow_table
+from optimx.utils.pipeline import CacheIOPipeline, CacheIOWorker
 from optimx.utils.pretty import describe, pretty_print_type
-from optimx.utils.pydantic import construct_recursive
+from optimx.utils.pydantic import TypeValidator, construct_recursive
+from optimx.utils.singleflight import SingleFlight
 
 logger = get_logger(__name__)
 
+# Guards the in-flight prediction counters of all models
+_in_flight_lock = threading.Lock()
+
 ModelDependency = TypeVar(
     "ModelDependency", bound=Union["Model", "AsyncModel", "WrappedAsyncModel"]
 )
@@ -48,11 +60,36 @@ ModelDependency = TypeVar(
 def optimx_predict_profiler(func):
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        with ExitStack() as stack:
-            if hasattr(self, "profiler"):
-                stack.enter_context(self.profiler.profile(self.configuration_key))
-            vals = func(self, *args, **kwargs)
-            yield from vals
+        with _in_flight_lock:
+            self._in_flight += 1
+        try:
+            with ExitStack() as stack:
+                if hasattr(self, "profiler"):
+                    stack.enter_context(self.profiler.profile(self.configuration_key))
+                vals = func(self, *args, **kwargs)
+                yield from vals
+        finally:
+            with _in_flight_lock:
+                self._in_flight -= 1
+
+    return wrapper
+
+
+def optimx_predict_profiler_async(func):
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        with _in_flight_lock:
+            self._in_flight += 1
+        try:
+            with ExitStack() as stack:
+                profiler = getattr(self, "profiler", None)
+                if profiler is not None and profiler.concurrent:
+                    stack.enter_context(profiler.profile(self.configuration_key))
+                async for val in func(self, *args, **kwargs):
+                    yield val
+        finally:
+            with _in_flight_lock:
+                self._in_flight -= 1
 
     return wrapper
 
@@ -109,7 +146,7 @@ class Asset:
         service_settings: Optional[LibrarySettings] = None,
         model_settings: Optional[Dict[str, Any]] = None,
         asset_path: str = "",
-        cache: Optional[Cache] = None,
+        cache: Optional[Union[Cache, AsyncCache]] = None,
         batch_size: Optional[int] = None,
         model_dependencies: Optional[
             Dict[str, Union["Model", "AsyncModel", "WrappedAsyncModel"]]
@@ -127,7 +164,7 @@ class Asset:
         self.configuration_key: Optional[str] = configuration_key
         self.service_settings: LibrarySettings = service_settings or LibrarySettings()
         self.asset_path: str = asset_path
-        self.cache: Optional[Cache] = cache
+        self.cache: Optional[Union[Cache, AsyncCache]] = cache
         self.model_settings: Dict[str, Any] = model_settings or {}
         self.batch_size: Optional[int] = batch_size or self.model_settings.get(
             "batch_size"
@@ -135,14 +172,72 @@ class Asset:
         self.model_dependencies: ModelDependenciesMapping = ModelDependenciesMapping(
             model_dependencies or {}
         )
+        # Model key under which predictions are cached
+        self._cache_model_key: Optional[str] = self.configuration_key
+        self._cache_version: Optional[str] = None
+        self._dependency_cache_versions: Dict[str, str] = {}
+        self._register_cache_key_fields()
 
         self._loaded: bool = False
+        # Number of predictions currently running, see `ModelLibrary.reload`
+        self._in_flight: int = 0
         self._load_time: Optional[float] = None
         self._load_memory_increment: Optional[float] = None
+        self._load_memory_size: Optional[int] = None
 
         if not self.service_settings.lazy_loading:
             self.load()
 
+    def _register_cache_key_fields(self):
+        if (
+            self._cache_model_key
+            and isinstance(self.cache, CacheKeyMixin)
+            and self.model_settings.get("cache_key_fields")
+        ):
+            # Only hash the item fields that matter to build cache keys
+            self.cache.set_key_fields(
+                self._cache_model_key, self.model_settings["cache_key_fields"]
+            )
+
+    def _set_cache_version(self, version: str):
+        """Caches predictions apart from those of other versions of the asset"""
+        self._cache_version = version
+        self._update_cache_model_key()
+
+    def _set_dependency_cache_version(self, configuration_key: str, version: str):
+        """Caches predictions apart from those made with other versions
+        of a dependency"""
+        self._dependency_cache_versions[configuration_key] = version
+        self._update_cache_model_key()
+
+    def _update_cache_model_key(self):
+        parts = [self.configuration_key or ""]
+        if self._cache_version is not None:
+            parts.append(self._cache_version)
+        parts.extend(
+            f"{key}={version}"
+            for key, version in sorted(self._dependency_cache_versions.items())
+        )
+        self._cache_model_key = ":".join(parts)
+        self._register_cache_key_fields()
+
+    @property
+    def mmap_assets(self) -> bool:
+        return self.model_settings.get("mmap_assets", self.service_settings.mmap_assets)
+
+    def load_array(self, *path: str):
+        """
+        Loads a `.npy` array from the asset directory, memory-mapped read-only in
+        `mmap_assets` mode so that pre-forked workers share its pages
+        """
+        return load_array(os.path.join(self.asset_path, *path), mmap=self.mmap_assets)
+
+    def load_arrow_table(self, *path: str):
+        """Loads an Arrow IPC table from the asset directory, see `load_array`"""
+        return load_arrow_table(
+            os.path.join(self.asset_path, *path), mmap=self.mmap_assets
+        )
+
     def load(self) -> None:
         """Load dependencies before loading the asset"""
         try:
@@ -157,8 +252,20 @@ class Asset:
             if not async_context and isinstance(m, AsyncModel):
                 self.model_dependencies[model_name] = WrappedAsyncModel(m)
 
-        with PerformanceTracker() as m:
+        attributes = set(vars(self))
+        with PerformanceTracker(
+            # the memory of the process also grows with the models loaded
+            # concurrently, it cannot be attributed to this one
+            self.service_settings.memory_tracker
+            if self.service_settings.preload_workers <= 1
+            else None
+        ) as m:
             self._load()
+        if self.service_settings.deep_memory_size:
+            # size of the objects held by the attributes set while loading
+            self._load_memory_size = deep_getsizeof(
+                *(v for k, v in vars(self).items() if k not in attributes)
+            )
 
         logger.debug(
             "Model loaded",
@@ -169,6 +276,7 @@ class Asset:
                 humanize.naturalsize(m.increment) if m.increment is not None else None
             ),
             memory_bytes=m.increment,
+            memory_size_bytes=self._load_memory_size,
         )
         self._loaded = True
         self._load_time = m.time
@@ -218,7 +326,12 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
         self._item_type: Optional[Type] = None
         self._return_type: Optional[Type] = None
         self._predict_mode: Optional[PredictMode] = None
+        self._validators: Dict[Type[InternalDataModel], TypeValidator] = {}
         super().__init__(**kwargs)
+        # Concurrent predictions of identical items wait on a single computation
+        self._single_flight: Optional[SingleFlight] = (
+            SingleFlight() if self.model_settings.get("coalesce_predictions") else None
+        )
         self.initialize_validation_models()
         self._check_is_overriden()
 
@@ -244,6 +357,7 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
                         data=(self._item_type, ...),
                         __base__=InternalDataModel,
                     )
+                    self._validators[self._item_model] = TypeValidator(self._item_type)
                 if _return_type != ReturnType:
                     self._return_type = _return_type
                     type_name = self.__class__.__name__ + "ReturnTypeModel"
@@ -252,6 +366,9 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
                         data=(self._return_type, ...),
                         __base__=InternalDataModel,
                     )
+                    self._validators[self._return_model] = TypeValidator(
+                        self._return_type
+                    )
         except Exception as exc:  # pragma: no cover
             raise errors.ValidationInitializationException(
                 f"{self.__class__.__name__}[{self.configuration_key}]", pydantic_exc=exc
@@ -261,6 +378,7 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
         state = copy.deepcopy(self.__dict__)
         state["_item_model"] = None
         state["_return_model"] = None
+        state["_validators"] = {}
         return state
 
     def __setstate__(self, state):
@@ -334,6 +452,12 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
                 f"[orange3]{humanize.naturalsize(self._load_memory_increment)}"
             )
 
+        if self._load_memory_size is not None:
+            sub_t = t.add(
+                f"[deep_sky_blue1]memory size[/deep_sky_blue1]: "
+                f"[orange3]{humanize.naturalsize(self._load_memory_size)}"
+            )
+
         if self.asset_path:
             sub_t = t.add(
                 f"[deep_sky_blue1]asset path[/deep_sky_blue1]: "
@@ -345,6 +469,11 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
                 f"[deep_sky_blue1]batch size[/deep_sky_blue1]: "
                 f"[orange3]{self.batch_size}"
             )
+        if self._single_flight:
+            sub_t = t.add(
+                f"[deep_sky_blue1]coalesced predictions[/deep_sky_blue1]: "
+                f"[orange3]{self._single_flight.coalesced}"
+            )
         if self.model_settings:
             sub_t = t.add("[deep_sky_blue1]model settings[/deep_sky_blue1]")
             describe(self.model_settings, t=sub_t)
@@ -393,16 +522,155 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
         if model:
             try:
                 if self.service_settings.enable_validation:
+                    validator = self._validators.get(model)
+                    if validator:
+                        return validator.validate(item)
                     return model(data=item).data
                 else:
                     return construct_recursive(model, data=item).data
-            except pydantic.error_wrappers.ValidationError as exc:
+            except pydantic.ValidationError as exc:
+                self._record_validation_error(exception)
                 raise exception(
                     f"{self.__class__.__name__}[{self.configuration_key}]",
                     pydantic_exc=exc,
                 ) from exc
         return item
 
+    def _validate_batch(
+        self,
+        items: List[Any],
+        model: Union[Type[InternalDataModel], None],
+        exception: Type[errors.OptimxDataValidationException],
+    ) -> List[Any]:
+        """
+        Validates a list of items, in a single call when the `batch_validation`
+        model setting is set
+        """
+        validator = self._validators.get(model) if model else None
+        if (
+            validator
+            and items
+            and self.service_settings.enable_validation
+            and self.model_settings.get("batch_validation")
+        ):
+            try:
+                return validator.validate_many(items)
+            except pydantic.ValidationError as exc:
+                self._record_validation_error(exception)
+                raise exception(
+                    f"{self.__class__.__name__}[{self.configuration_key}]",
+                    pydantic_exc=exc,
+                ) from exc
+        return [self._validate(item, model, exception) for item in items]
+
+    def _validate_returns(self, predictions: List[Any]) -> Iterator[Any]:
+        if not self.model_settings.get("validate_returns", True):
+            return iter(predictions)
+        if self.model_settings.get("batch_validation"):
+            return iter(
+                self._validate_batch(
+                    predictions,
+                    self._return_model,
+                    errors.ReturnValueValidationException,
+                )
+            )
+        return (
+            self._validate(
+                prediction,
+                self._return_model,
+                errors.ReturnValueValidationException,
+            )
+            for prediction in predictions
+        )
+
+    def _caching_enabled(self) -> bool:
+        return bool(
+            self.configuration_key
+            and self.cache
+            and self.model_settings.get("cache_predictions")
+        )
+
+    def _span(self, name: str) -> typing.ContextManager:
+        if hasattr(self, "profiler"):
+            return self.profiler.span(self.configuration_key, name)
+        return nullcontext()
+
+    def _record_validation_error(
+        self, exception: Type[errors.OptimxDataValidationException]
+    ):
+        if hasattr(self, "profiler"):
+            self.profiler.record_validation_error(
+                self.configuration_key, exception.__name__
+            )
+
+    def _record_batch(self, cache_items: List[CacheItem], batch_size: int):
+        if hasattr(self, "profiler"):
+            cache_lookups = len(cache_items) if self._caching_enabled() else 0
+            self.profiler.record_batch(
+                self.configuration_key,
+                batch_size,
+                cache_lookups,
+                cache_lookups and len(cache_items) - batch_size,
+            )
+
+    def _iterate_cache_items(
+        self,
+        items: Iterator[ItemType],
+        window_size: int,
+        _force_compute: bool,
+        kwargs: Dict[str, Any],
+    ) -> Iterator[CacheItem]:
+        """Wrap items into `CacheItem`s holding their status within the cache.
+
+        Items are read by windows of `window_size`, and the cache status of each
+        window is resolved with a single `get_many` call.
+        """
+        if not self._caching_enabled():
+            # When no cache is active, all of them should be computed
+            for item in items:
+                yield CacheItem(item, None, None, True)
+            return
+        for window in _windows(items, window_size):
+            yield from self._get_cache_items(window, _force_compute, kwargs)
+
+    def _get_cache_items(
+        self, items: List[ItemType], _force_compute: bool, kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        cache = cast(Cache, self.cache)
+        with self._span("cache_lookup"):
+            if not _force_compute:
+                # The cache will return CacheItems with the information
+                # as to the stored value (if it exists) and if it is missing
+                # the cache_key needed to store it
+                return cache.get_many(cast(str, self._cache_model_key), items, kwargs)
+            # When force_recomputing, we still need to get the cache key
+            return [
+                CacheItem(
+                    item,
+                    cache.hash_key(cast(str, self._cache_model_key), item, kwargs),
+                    None,
+                    True,
+                )
+                for item in items
+            ]
+
+    def _coalescing_keys(
+        self, cache_items: List[CacheItem], kwargs: Dict[str, Any]
+    ) -> List[bytes]:
+        """Keys identifying the items to compute within the single-flight layer"""
+        single_flight = cast(SingleFlight, self._single_flight)
+        model_key = self._cache_model_key or self.__class__.__name__
+        return [
+            cache_item.cache_key
+            or (
+                self.cache.hash_key(model_key, cache_item.item, kwargs)
+                if self.cache
+                else single_flight.hash_key(model_key, cache_item.item, kwargs)
+            )
+            for cache_item in cache_items
+            if cache_item.missing
+        ]
+
     def test(self):
         console = Console()
         for i, (model_key, item, expected, keyword_args) in enumerate(
@@ -445,12 +713,32 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
             )
 
 
+def _windows(items: Iterator[Any], window_size: int) -> Iterator[List[Any]]:
+    window: List[Any] = []
+    for item in items:
+        window.append(item)
+        if len(window) >= window_size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
 def add_dependencies_load_info(load_info_dict, my_model):
+    """
+    Collects the load information of all the transitive dependencies of a model,
+    keyed by configuration so that models shared by several dependencies, or
+    referred to under different names, are only counted once.
+    """
     for model_name, model_dep in my_model.model_dependencies.models.items():
-        if model_name not in load_info_dict:
-            load_info_dict[model_name] = {
+        if isinstance(model_dep, WrappedAsyncModel):
+            model_dep = model_dep.async_model
+        key = model_dep.configuration_key or model_name
+        if key not in load_info_dict:
+            load_info_dict[key] = {
                 "time": model_dep._load_time or 0,
                 "memory_increment": model_dep._load_memory_increment or 0,
+                "memory_size": model_dep._load_memory_size or 0,
             }
             add_dependencies_load_info(load_info_dict, model_dep)
 
@@ -484,6 +772,21 @@ class NoPredictOverridenError(Exception):
 
 
 class Model(AbstractModel[ItemType, ReturnType]):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Batches are sharded across a pool of threads or processes
+        self._executor: Optional[BatchExecutor] = (
+            BatchExecutor(
+                self.model_settings["executor"], self.model_settings.get("workers")
+            )
+            if self.model_settings.get("executor")
+            else None
+        )
+        # Cache lookups and writes of the prediction streams run on one thread
+        self._cache_io: Optional[CacheIOWorker] = (
+            CacheIOWorker() if self.model_settings.get("pipeline") else None
+        )
+
     @not_overriden
     @abc.abstractmethod
     def _predict(self, item: ItemType, **kwargs) -> ReturnType:  # pragma: no cover
@@ -553,11 +856,50 @@ class Model(AbstractModel[ItemType, ReturnType]):
         **kwargs,
     ) -> Iterator[ReturnType]:
         batch_size = batch_size or (self.batch_size or 1)
+        cache_io: Optional[CacheIOPipeline] = None
+        if self._cache_io and self._caching_enabled():
+            windows = _windows(items, batch_size)
+            # a single window, e.g. of `predict`, leaves nothing to overlap
+            head = list(itertools.islice(windows, 2))
+            if len(head) > 1:
+                # Cache lookups and writes overlap with the computation
+                pipeline = self.model_settings.get("pipeline")
+                cache_io = CacheIOPipeline(
+                    self._cache_io, depth=1 if pipeline is True else pipeline
+                )
+                cache_items_iterator = cache_io.lookups(
+                    itertools.chain(head, windows),
+                    lambda window: self._get_cache_items(
+                        window, _force_compute, kwargs
+                    ),
+                )
+            else:
+                items = itertools.chain.from_iterable(head)
+        if not cache_io:
+            cache_items_iterator = self._iterate_cache_items(
+                items, batch_size, _force_compute, kwargs
+            )
+        try:
+            yield from self._predict_cache_items_iterator(
+                cache_items_iterator, batch_size, _callback, cache_io, **kwargs
+            )
+        finally:
+            if cache_io:
+                cache_io.close()
+
+    def _predict_cache_items_iterator(
+        self,
+        cache_items_iterator: Iterator[CacheItem],
+        batch_size: int,
+        _callback: Optional[Callable[[int, List[ItemType], List[ReturnType]], None]],
+        _cache_io: Optional[CacheIOPipeline],
+        **kwargs,
+    ) -> Iterator[ReturnType]:
         n_items_to_compute = 0
         n_items_from_cache = 0
         cache_items: List[CacheItem] = []
         step = 0
-        for current_item in items:
+        for cache_item in cache_items_iterator:
             # This loops creates a list of `CacheItems` which
             # wrap the items with information as to their
             # status within the cache.
@@ -567,43 +909,20 @@ class Model(AbstractModel[ItemType, ReturnType]):
             # Once we have 2 x batch_size elements available from cache
             # we yield them to avoid indefinite increase in the cache_item
             # list size.
-            if (
-                self.configuration_key
-                and self.cache
-                and self.model_settings.get("cache_predictions")
-            ):
-                if not _force_compute:
-                    # The cache will return a CacheItem with the information
-                    # as to the stored value (if it exists) and if it is missing
-                    # the cache_key needed to store it
-                    cache_item = self.cache.get(
-                        self.configuration_key, current_item, kwargs
-                    )
-                else:
-                    # When force_recomputing, we still need to get
-                    # the cache key
-                    cache_item = CacheItem(
-                        current_item,
-                        self.cache.hash_key(
-                            self.configuration_key, current_item, kwargs
-                        ),
-                        None,
-                        True,
-                    )
-                if cache_item.missing:
-                    n_items_to_compute += 1
-                else:
-                    n_items_from_cache += 1
-                cache_items.append(cache_item)
-            else:
-                # When no cache is active, all of them should be computed
-                cache_items.append(CacheItem(current_item, None, None, True))
+            if cache_item.missing:
                 n_items_to_compute += 1
+            else:
+                n_items_from_cache += 1
+            cache_items.append(cache_item)
             if batch_size and (
                 n_items_to_compute == batch_size or n_items_from_cache == 2 * batch_size
             ):
                 yield from self._predict_cache_items(
-                    step, cache_items, _callback=_callback, **kwargs
+                    step,
+                    cache_items,
+                    _callback=_callback,
+                    _cache_io=_cache_io,
+                    **kwargs,
                 )
                 cache_items = []
                 n_items_to_compute = 0
@@ -612,9 +931,34 @@ class Model(AbstractModel[ItemType, ReturnType]):
 
         if cache_items:
             yield from self._predict_cache_items(
-                step, cache_items, _callback=_callback, **kwargs
+                step, cache_items, _callback=_callback, _cache_io=_cache_io, **kwargs
             )
 
+    def _predict_batch_coalesced(
+        self, batch: List[ItemType], keys: List[bytes], **kwargs
+    ) -> List[ReturnType]:
+        """Only compute the items that are not already being computed by a
+        concurrent call, and wait for the results of the others."""
+        single_flight = cast(SingleFlight, self._single_flight)
+        led, followed = single_flight.join(keys)
+        led_keys = [keys[i] for i in led]
+        try:
+            led_predictions = (
+                list(self._execute_predict_batch([batch[i] for i in led], **kwargs))
+                if led
+                else []
+            )
+        except BaseException as exc:
+            single_flight.reject(led_keys, exc)
+            raise
+        single_flight.resolve(led_keys, led_predictions)
+        predictions: List[Any] = [None] * len(batch)
+        for i, prediction in zip(led, led_predictions):
+            predictions[i] = prediction
+        for i, future in followed.items():
+            predictions[i] = future.result()
+        return predictions
+
     def _predict_cache_items(
         self,
         _step: int,
@@ -622,48 +966,71 @@ class Model(AbstractModel[ItemType, ReturnType]):
         _callback: Optional[
             Callable[[int, List[ItemType], List[ReturnType]], None]
         ] = None,
+        _cache_io: Optional[CacheIOPipeline] = None,
         **kwargs,
     ) -> Iterator[ReturnType]:
-        batch = [
-            self._validate(res.item, self._item_model, errors.ItemValidationException)
-            for res in cache_items
-            if res.missing
-        ]
+        with self._span("validation"):
+            batch = self._validate_batch(
+                [res.item for res in cache_items if res.missing],
+                self._item_model,
+                errors.ItemValidationException,
+            )
         try:
-            predictions = iter(self._predict_batch(batch, **kwargs))
+            with self._span("predict_batch"):
+                if self._single_flight:
+                    predictions = iter(
+                        self._predict_batch_coalesced(
+                            batch, self._coalescing_keys(cache_items, kwargs), **kwargs
+                        )
+                    )
+                else:
+                    predictions = iter(self._execute_predict_batch(batch, **kwargs))
         except BaseException as exc:
             raise errors.PredictionError(exc=exc) from exc
+        self._record_batch(cache_items, len(batch))
         current_predictions = []
-        try:
-            for cache_item in cache_items:
-                if cache_item.missing:
-                    current_predictions.append(next(predictions))
-                    if (
-                        cache_item.cache_key
-                        and self.configuration_key
-                        and self.cache
-                        and self.model_settings.get("cache_predictions")
-                    ):
-                        self.cache.set(cache_item.cache_key, current_predictions[-1])
-                    yield self._validate(
-                        current_predictions[-1],
-                        self._return_model,
-                        errors.ReturnValueValidationException,
-                    )
-                else:
-                    current_predictions.append(cache_item.cache_value)
-                    yield self._validate(
-                        current_predictions[-1],
-                        self._return_model,
-                        errors.ReturnValueValidationException,
+        cache_entries = []
+        for cache_item in cache_items:
+            if cache_item.missing:
+                current_predictions.append(next(predictions))
+                if (
+                    cache_item.cache_key
+                    and self.configuration_key
+                    and self.cache
+                    and self.model_settings.get("cache_predictions")
+                ):
+                    cache_entries.append(
+                        (cache_item.cache_key, current_predictions[-1])
                     )
+            else:
+                current_predictions.append(cache_item.cache_value)
+        if cache_entries:
+            # All new predictions of the batch are written in one call
+            if _cache_io:
+                _cache_io.write(cast(Cache, self.cache).set_many, cache_entries)
+            else:
+                with self._span("cache_write"):
+                    cast(Cache, self.cache).set_many(cache_entries)
+        try:
+            for prediction in self._validate_returns(current_predictions):
+                yield prediction
         except GeneratorExit:
             pass
         if _callback:
             _callback(_step, batch, current_predictions)
 
+    def _execute_predict_batch(
+        self, items: List[ItemType], **kwargs
+    ) -> List[ReturnType]:
+        if self._executor:
+            return self._executor.predict_batch(self, items, kwargs)
+        return self._predict_batch(items, **kwargs)
+
     def close(self):
-        pass
+        if self._executor:
+            self._executor.shutdown()
+        if self._cache_io:
+            self._cache_io.shutdown()
 
 
 class AsyncModel(AbstractModel[ItemType, ReturnType]):
@@ -676,7 +1043,24 @@ class AsyncModel(AbstractModel[ItemType, ReturnType]):
 
     @not_overriden
     async def _predict_batch(self, items: List[ItemType], **kwargs) -> List[ReturnType]:
-        return [await self._predict(p, **kwargs) for p in items]
+        max_concurrency = self.model_settings.get("max_concurrency") or 1
+        if max_concurrency == 1 or len(items) < 2:
+            return [await self._predict(p, **kwargs) for p in items]
+        # Predict up to `max_concurrency` items at once, and raise the error of
+        # the first failing item as the sequential implementation would
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _bounded_predict(item):
+            async with semaphore:
+                return await self._predict(item, **kwargs)
+
+        results = await asyncio.gather(
+            *(_bounded_predict(p) for p in items), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
 
     @errors.wrap_optimx_exceptions_async
     async def __call__(
@@ -726,6 +1110,7 @@ class AsyncModel(AbstractModel[ItemType, ReturnType]):
             )
         ]
 
+    @optimx_predict_profiler_async
     @errors.wrap_optimx_exceptions_gen_async
     async def predict_gen(
         self,
@@ -743,33 +1128,14 @@ class AsyncModel(AbstractModel[ItemType, ReturnType]):
         n_items_from_cache = 0
         cache_items: List[CacheItem] = []
         step = 0
-        for current_item in items:
-            if (
-                self.configuration_key
-                and self.cache
-                and self.model_settings.get("cache_predictions")
-            ):
-                if not _force_compute:
-                    cache_item = self.cache.get(
-                        self.configuration_key, current_item, kwargs
-                    )
-                else:
-                    cache_item = CacheItem(
-                        current_item,
-                        self.cache.hash_key(
-                            self.configuration_key, current_item, kwargs
-                        ),
-                        None,
-                        True,
-                    )
-                if cache_item.missing:
-                    n_items_to_compute += 1
-                else:
-                    n_items_from_cache += 1
-                cache_items.append(cache_item)
-            else:
-                cache_items.append(CacheItem(current_item, None, None, True))
+        async for cache_item in self._iterate_cache_items(
+            items, batch_size, _force_compute, kwargs
+        ):
+            if cache_item.missing:
                 n_items_to_compute += 1
+            else:
+                n_items_from_cache += 1
+            cache_items.append(cache_item)
 
             if batch_size and (
                 n_items_to_compute == batch_size or n_items_from_cache == 2 * batch_size
@@ -789,6 +1155,62 @@ class AsyncModel(AbstractModel[ItemType, ReturnType]):
             ):
                 yield r
 
+    async def _iterate_cache_items(  # type: ignore[override]
+        self,
+        items: Iterator[ItemType],
+        window_size: int,
+        _force_compute: bool,
+        kwargs: Dict[str, Any],
+    ) -> AsyncIterator[CacheItem]:
+        """Asynchronous counterpart of `AbstractModel._iterate_cache_items`, which
+        awaits lookups when the model is given an `AsyncCache`."""
+        if not self._caching_enabled():
+            for item in items:
+                yield CacheItem(item, None, None, True)
+            return
+        for window in _windows(items, window_size):
+            for cache_item in await self._aget_cache_items(
+                window, _force_compute, kwargs
+            ):
+                yield cache_item
+
+    async def _aget_cache_items(
+        self, items: List[ItemType], _force_compute: bool, kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        if isinstance(self.cache, AsyncCache) and not _force_compute:
+            with self._span("cache_lookup"):
+                return await self.cache.get_many(
+                    cast(str, self._cache_model_key), items, kwargs
+                )
+        return self._get_cache_items(items, _force_compute, kwargs)
+
+    async def _predict_batch_coalesced(
+        self, batch: List[ItemType], keys: List[bytes], **kwargs
+    ) -> List[ReturnType]:
+        """Only compute the items that are not already being computed by a
+        concurrent call, and wait for the results of the others."""
+        single_flight = cast(SingleFlight, self._single_flight)
+        led, followed = single_flight.join(keys)
+        led_keys = [keys[i] for i in led]
+        try:
+            led_predictions = (
+                list(
+                    await self._execute_predict_batch([batch[i] for i in led], **kwargs)
+                )
+                if led
+                else []
+            )
+        except BaseException as exc:
+            single_flight.reject(led_keys, exc)
+            raise
+        single_flight.resolve(led_keys, led_predictions)
+        predictions: List[Any] = [None] * len(batch)
+        for i, prediction in zip(led, led_predictions):
+            predictions[i] = prediction
+        for i, future in followed.items():
+            predictions[i] = await asyncio.wrap_future(future)
+        return predictions
+
     async def _predict_cache_items(
         self,
         _step: int,
@@ -798,44 +1220,63 @@ class AsyncModel(AbstractModel[ItemType, ReturnType]):
         ] = None,
         **kwargs,
     ) -> AsyncIterator[ReturnType]:
-        batch = [
-            self._validate(res.item, self._item_model, errors.ItemValidationException)
-            for res in cache_items
-            if res.missing
-        ]
+        with self._span("validation"):
+            batch = self._validate_batch(
+                [res.item for res in cache_items if res.missing],
+                self._item_model,
+                errors.ItemValidationException,
+            )
         try:
-            predictions = iter(await self._predict_batch(batch, **kwargs))
+            with self._span("predict_batch"):
+                if self._single_flight:
+                    predictions = iter(
+                        await self._predict_batch_coalesced(
+                            batch, self._coalescing_keys(cache_items, kwargs), **kwargs
+                        )
+                    )
+                else:
+                    predictions = iter(
+                        await self._execute_predict_batch(batch, **kwargs)
+                    )
         except BaseException as exc:
             raise errors.PredictionError(exc=exc) from exc
+        self._record_batch(cache_items, len(batch))
         current_predictions = []
-        try:
-            for cache_item in cache_items:
-                if cache_item.missing:
-                    current_predictions.append(next(predictions))
-                    if (
-                        cache_item.cache_key
-                        and self.configuration_key
-                        and self.cache
-                        and self.model_settings.get("cache_predictions")
-                    ):
-                        self.cache.set(cache_item.cache_key, current_predictions[-1])
-                    yield self._validate(
-                        current_predictions[-1],
-                        self._return_model,
-                        errors.ReturnValueValidationException,
+        cache_entries = []
+        for cache_item in cache_items:
+            if cache_item.missing:
+                current_predictions.append(next(predictions))
+                if (
+                    cache_item.cache_key
+                    and self.configuration_key
+                    and self.cache
+                    and self.model_settings.get("cache_predictions")
+                ):
+                    cache_entries.append(
+                        (cache_item.cache_key, current_predictions[-1])
                     )
+            else:
+                current_predictions.append(cache_item.cache_value)
+        if cache_entries:
+            # All new predictions of the batch are written in one call
+            with self._span("cache_write"):
+                if isinstance(self.cache, AsyncCache):
+                    await self.cache.set_many(cache_entries)
                 else:
-                    current_predictions.append(cache_item.cache_value)
-                    yield self._validate(
-                        current_predictions[-1],
-                        self._return_model,
-                        errors.ReturnValueValidationException,
-                    )
+                    cast(Cache, self.cache).set_many(cache_entries)
+        try:
+            for prediction in self._validate_returns(current_predictions):
+                yield prediction
         except GeneratorExit:
             pass
         if _callback:
             _callback(_step, batch, current_predictions)
 
+    async def _execute_predict_batch(
+        self, items: List[ItemType], **kwargs
+    ) -> List[ReturnType]:
+        return await self._predict_batch(items, **kwargs)
+
     async def close(self):
         pass
 
@@ -843,9 +1284,34 @@ class AsyncModel(AbstractModel[ItemType, ReturnType]):
 class WrappedAsyncModel:
     def __init__(self, async_model: AsyncModel[ItemType, ReturnType]):
         self.async_model = async_model
-        self.predict = AsyncToSync(self.async_model.predict)
-        self.predict_batch = AsyncToSync(self.async_model.predict_batch)
+        # calls share the background event loop, and the connection pools bound
+        # to it, rather than running on a new event loop each
+        self.predict = run_sync(self.async_model.predict)
+        self.predict_batch = run_sync(self.async_model.predict_batch)
         self._loaded: bool = True
-        # The following does not currently work, because AsyncToSync does not
-        # seem to correctly wrap asynchronous generators
-        # self.predict_gen = AsyncToSync(self.async_model.predict_gen)
+
+    def predict_gen(
+        self,
+        items: Iterator[ItemType],
+        batch_size: Optional[int] = None,
+        _callback: Optional[
+            Callable[[int, List[ItemType], List[ReturnType]], None]
+        ] = None,
+        _force_compute: bool = False,
+        **kwargs,
+    ) -> Iterator[ReturnType]:
+        """
+        The generator runs on the background event loop, at most two batches
+        ahead of the caller
+        """
+        batch_size = batch_size or (self.async_model.batch_size or 1)
+        return iterate_async_gen(
+            self.async_model.predict_gen(
+                items,
+                batch_size=batch_size,
+                _callback=_callback,
+                _force_compute=_force_compute,
+                **kwargs,
+            ),
+            buffer_size=2 * batch_size,
+        )
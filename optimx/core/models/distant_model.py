@@ -1,6 +1,8 @@
-import json
+import asyncio
+import concurrent.futures
+import re
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Any, Callable, List, Optional, Union, cast
 
 import aiohttp
 import requests
@@ -13,16 +15,22 @@ from tenacity import (
 )
 
 from optimx.core.model import AsyncModel, Model
+from optimx.core.models.http_transport import (
+    DistantHTTPModelError,  # noqa: F401
+    HTTPTransport,
+    HTTPTransportSettings,
+    acquire_async_transport,
+    get_async_transport,
+    get_transport,
+    release_async_transport,
+    release_transport,
+)
+from optimx.core.models.resilience import EndpointRouter, make_router
 from optimx.core.types import ItemType, ReturnType
 
 logger = get_logger(__name__)
 
 
-class DistantHTTPModelError(Exception):
-    def __init__(self, status_code, reason, text):
-        super().__init__(f"Service model error [{status_code} {reason}]: {text}")
-
-
 def log_after_retry(retry_state):
     logger.info(
         "Retrying",
@@ -47,14 +55,85 @@ class SERVICE_MODEL_RETRY_POLICY:
     reraise: bool = True
 
 
+def resolve_batch_endpoint(
+    endpoint: str, batch_endpoint: Optional[Union[str, bool]]
+) -> Optional[str]:
+    """
+    Endpoint predicting lists of items, either given, or `True` to derive it
+    from the endpoint of an optimx API (`/predict/<model>` is served along
+    with `/predict/batch/<model>`)
+    """
+    if batch_endpoint is True:
+        derived, n = re.subn(
+            r"/predict/(?!batch/)([^/?]+)/?$", r"/predict/batch/\1", endpoint
+        )
+        if not n:
+            raise ValueError(
+                f"Cannot derive the batch endpoint of `{endpoint}`, "
+                "which is not an optimx `/predict/<model>` route"
+            )
+        return derived
+    return batch_endpoint or None
+
+
+def _endpoints(endpoints: Union[str, List[str]]) -> List[str]:
+    """Endpoints of a model, whose requests are balanced between them"""
+    if isinstance(endpoints, str):
+        return [endpoints]
+    return list(dict.fromkeys(endpoints))
+
+
+def _chunks(items: List[Any], chunk_size: int) -> List[List[Any]]:
+    return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def _check_chunk_predictions(chunk: List[Any], predictions: List[Any]):
+    if len(predictions) != len(chunk):
+        raise ValueError(
+            f"The batch endpoint returned {len(predictions)} predictions "
+            f"for {len(chunk)} items"
+        )
+
+
 class AsyncDistantHTTPModel(AsyncModel[ItemType, ReturnType]):
+    """
+    Model calling a distant endpoint for each item. Lists of items are sent
+    by chunks of `batch_chunk_size` to the `batch_endpoint` if it is set, with
+    at most `batch_max_in_flight` concurrent requests.
+
+    The `endpoint` may be a list of replicas, between which requests are
+    balanced, with the `circuit_breaker` and `hedging` settings of
+    `optimx.core.models.resilience`.
+    """
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.endpoint = self.model_settings["endpoint"]
+        self.endpoints = _endpoints(self.model_settings["endpoint"])
+        self.endpoint = self.endpoints[0]
+        self.router = make_router(self.endpoints, self.model_settings)
         self.endpoint_headers = self.model_settings.get("endpoint_headers", {})
         self.endpoint_params = self.model_settings.get("endpoint_params", {})
-        self.aiohttp_session: Optional[aiohttp.ClientSession] = None
+        self.transport_settings = HTTPTransportSettings(
+            **self.model_settings.get("transport", {})
+        )
+        acquire_async_transport(self.transport_settings)
+        self._transport_released = False
         self.timeout = self.model_settings.get("timeout", 60)
+        self.batch_router: Optional[EndpointRouter] = None
+        if self.model_settings.get("batch_endpoint"):
+            self.batch_router = make_router(
+                _endpoints(
+                    [
+                        resolve_batch_endpoint(
+                            endpoint, self.model_settings["batch_endpoint"]
+                        )
+                        for endpoint in self.endpoints
+                    ]
+                ),
+                self.model_settings,
+            )
+        self.batch_chunk_size = self.model_settings.get("batch_chunk_size", 64)
+        self.batch_max_in_flight = self.model_settings.get("batch_max_in_flight", 1)
 
     def _load(self):
         pass
@@ -67,43 +146,105 @@ class AsyncDistantHTTPModel(AsyncModel[ItemType, ReturnType]):
         reraise=SERVICE_MODEL_RETRY_POLICY.reraise,
     )
     async def _predict(self, item, **kwargs):
-        if self.aiohttp_session is None:
-            self.aiohttp_session = aiohttp.ClientSession()
-        try:
-            item = json.dumps(item)
-        except TypeError:
-            # TypeError: Object of type {ItemType} is not JSON serializable
-            # Try converting the pydantic model to json directly
-            item = item.json()
-        async with self.aiohttp_session.post(
-            self.endpoint,
-            params=kwargs.get("endpoint_params", self.endpoint_params),
-            data=item,
-            headers={
-                "content-type": "application/json",
-                **kwargs.get("endpoint_headers", self.endpoint_headers),
-            },
-            timeout=self.timeout,
-        ) as response:
-            if response.status != 200:
-                raise DistantHTTPModelError(
-                    response.status, response.reason, await response.text()
-                )
-            return await response.json()
+        transport = get_async_transport(self.transport_settings)
+        return await self.router.acall(
+            lambda endpoint: transport.post(
+                endpoint,
+                item,
+                params=kwargs.get("endpoint_params", self.endpoint_params),
+                headers=kwargs.get("endpoint_headers", self.endpoint_headers),
+                timeout=self.timeout,
+            )
+        )
+
+    @retry(
+        wait=SERVICE_MODEL_RETRY_POLICY.wait,
+        stop=SERVICE_MODEL_RETRY_POLICY.stop,
+        retry=SERVICE_MODEL_RETRY_POLICY.retry,
+        after=SERVICE_MODEL_RETRY_POLICY.after,
+        reraise=SERVICE_MODEL_RETRY_POLICY.reraise,
+    )
+    async def _predict_chunk(self, chunk, **kwargs):
+        transport = get_async_transport(self.transport_settings)
+        predictions = await cast(EndpointRouter, self.batch_router).acall(
+            lambda endpoint: transport.post(
+                endpoint,
+                chunk,
+                params=kwargs.get("endpoint_params", self.endpoint_params),
+                headers=kwargs.get("endpoint_headers", self.endpoint_headers),
+                timeout=self.timeout,
+            )
+        )
+        _check_chunk_predictions(chunk, predictions)
+        return predictions
+
+    async def _execute_predict_batch(self, items, **kwargs):
+        if not self.batch_router or len(items) < 2:
+            return await super()._execute_predict_batch(items, **kwargs)
+        semaphore = asyncio.Semaphore(self.batch_max_in_flight)
+
+        async def _bounded_predict_chunk(chunk):
+            async with semaphore:
+                return await self._predict_chunk(chunk, **kwargs)
+
+        results = await asyncio.gather(
+            *(
+                _bounded_predict_chunk(chunk)
+                for chunk in _chunks(items, self.batch_chunk_size)
+            ),
+            return_exceptions=True,
+        )
+        # raise the error of the first failing chunk
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return [prediction for result in results for prediction in result]
 
     async def close(self):
-        if self.aiohttp_session:
-            return self.aiohttp_session.close()
+        if not self._transport_released:
+            self._transport_released = True
+            await release_async_transport(self.transport_settings)
 
 
 class DistantHTTPModel(Model[ItemType, ReturnType]):
+    """
+    Model calling a distant endpoint for each item. Lists of items are sent
+    by chunks of `batch_chunk_size` to the `batch_endpoint` if it is set, with
+    at most `batch_max_in_flight` concurrent requests.
+
+    The `endpoint` may be a list of replicas, between which requests are
+    balanced, with the `circuit_breaker` and `hedging` settings of
+    `optimx.core.models.resilience`.
+    """
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.endpoint = self.model_settings["endpoint"]
+        self.endpoints = _endpoints(self.model_settings["endpoint"])
+        self.endpoint = self.endpoints[0]
+        self.router = make_router(self.endpoints, self.model_settings)
         self.endpoint_headers = self.model_settings.get("endpoint_headers", {})
         self.endpoint_params = self.model_settings.get("endpoint_params", {})
-        self.requests_session: Optional[requests.Session] = None
+        self.transport_settings = HTTPTransportSettings(
+            **self.model_settings.get("transport", {})
+        )
+        self.transport: Optional[HTTPTransport] = None
         self.timeout = self.model_settings.get("timeout", 60)
+        self.batch_router: Optional[EndpointRouter] = None
+        if self.model_settings.get("batch_endpoint"):
+            self.batch_router = make_router(
+                _endpoints(
+                    [
+                        resolve_batch_endpoint(
+                            endpoint, self.model_settings["batch_endpoint"]
+                        )
+                        for endpoint in self.endpoints
+                    ]
+                ),
+                self.model_settings,
+            )
+        self.batch_chunk_size = self.model_settings.get("batch_chunk_size", 64)
+        self.batch_max_in_flight = self.model_settings.get("batch_max_in_flight", 1)
+        self._chunks_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
 
     def _load(self):
         pass
@@ -116,33 +257,72 @@ class DistantHTTPModel(Model[ItemType, ReturnType]):
         reraise=SERVICE_MODEL_RETRY_POLICY.reraise,
     )
     def _predict(self, item, **kwargs):
-        if not self.requests_session:
-            self.requests_session = requests.Session()
-        try:
-            item = json.dumps(item)
-        except TypeError:
-            # TypeError: Object of type {ItemType} is not JSON serializable
-            # Try converting the pydantic model to json directly
-            item = item.json()
-        response = self.requests_session.post(
-            self.endpoint,
-            params=kwargs.get("endpoint_params", self.endpoint_params),
-            data=item,
-            headers={
-                "content-type": "application/json",
-                **kwargs.get("endpoint_headers", self.endpoint_headers),
-            },
-            timeout=self.timeout,
+        if not self.transport:
+            self.transport = get_transport(self.transport_settings)
+        transport = self.transport
+        return self.router.call(
+            lambda endpoint: transport.post(
+                endpoint,
+                item,
+                params=kwargs.get("endpoint_params", self.endpoint_params),
+                headers=kwargs.get("endpoint_headers", self.endpoint_headers),
+                timeout=self.timeout,
+            )
         )
-        if response.status_code != 200:
-            raise DistantHTTPModelError(
-                response.status_code, response.reason, response.text
+
+    @retry(
+        wait=SERVICE_MODEL_RETRY_POLICY.wait,
+        stop=SERVICE_MODEL_RETRY_POLICY.stop,
+        retry=SERVICE_MODEL_RETRY_POLICY.retry,
+        after=SERVICE_MODEL_RETRY_POLICY.after,
+        reraise=SERVICE_MODEL_RETRY_POLICY.reraise,
+    )
+    def _predict_chunk(self, chunk, **kwargs):
+        if not self.transport:
+            self.transport = get_transport(self.transport_settings)
+        transport = self.transport
+        predictions = cast(EndpointRouter, self.batch_router).call(
+            lambda endpoint: transport.post(
+                endpoint,
+                chunk,
+                params=kwargs.get("endpoint_params", self.endpoint_params),
+                headers=kwargs.get("endpoint_headers", self.endpoint_headers),
+                timeout=self.timeout,
+            )
+        )
+        _check_chunk_predictions(chunk, predictions)
+        return predictions
+
+    def _execute_predict_batch(self, items, **kwargs):
+        if not self.batch_router or len(items) < 2:
+            return super()._execute_predict_batch(items, **kwargs)
+        chunks = _chunks(items, self.batch_chunk_size)
+        if self.batch_max_in_flight > 1 and len(chunks) > 1:
+            if self._chunks_executor is None:
+                self._chunks_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.batch_max_in_flight,
+                    thread_name_prefix="optimx-distant-chunks",
+                )
+            results = list(
+                self._chunks_executor.map(
+                    lambda chunk: self._predict_chunk(chunk, **kwargs), chunks
+                )
             )
-        return response.json()
+        else:
+            results = [self._predict_chunk(chunk, **kwargs) for chunk in chunks]
+        return [prediction for result in results for prediction in result]
 
     def close(self):
-        if self.requests_session:
-            return self.requests_session.close()
+        super().close()
+        self.router.close()
+        if self._chunks_executor:
+            self._chunks_executor.shutdown()
+            self._chunks_executor = None
+        if self.batch_router:
+            self.batch_router.close()
+        if self.transport:
+            transport, self.transport = self.transport, None
+            release_transport(transport)
 
 
 class DistantHTTPBatchModel(Model[ItemType, ReturnType]):
@@ -153,10 +333,15 @@ class DistantHTTPBatchModel(Model[ItemType, ReturnType]):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.endpoint = self.model_settings["endpoint"]
+        self.endpoints = _endpoints(self.model_settings["endpoint"])
+        self.endpoint = self.endpoints[0]
+        self.router = make_router(self.endpoints, self.model_settings)
         self.endpoint_headers = self.model_settings.get("endpoint_headers", {})
         self.endpoint_params = self.model_settings.get("endpoint_params", {})
-        self.requests_session: Optional[requests.Session] = None
+        self.transport_settings = HTTPTransportSettings(
+            **self.model_settings.get("transport", {})
+        )
+        self.transport: Optional[HTTPTransport] = None
         self.timeout = self.model_settings.get("timeout", 60)
 
     def _load(self):
@@ -170,33 +355,25 @@ class DistantHTTPBatchModel(Model[ItemType, ReturnType]):
         reraise=SERVICE_MODEL_RETRY_POLICY.reraise,
     )
     def _predict_batch(self, items, **kwargs):
-        if not self.requests_session:
-            self.requests_session = requests.Session()
-        try:
-            items = json.dumps(items)
-        except TypeError:
-            # TypeError: Object of type {ItemType} is not JSON serializable
-            # Try converting a list of pydantic models to dict
-            items = json.dumps([item.dict() for item in items])
-        response = self.requests_session.post(
-            self.endpoint,
-            params=kwargs.get("endpoint_params", self.endpoint_params),
-            data=items,
-            headers={
-                "content-type": "application/json",
-                **kwargs.get("endpoint_headers", self.endpoint_headers),
-            },
-            timeout=self.timeout,
-        )
-        if response.status_code != 200:
-            raise DistantHTTPModelError(
-                response.status_code, response.reason, response.text
+        if not self.transport:
+            self.transport = get_transport(self.transport_settings)
+        transport = self.transport
+        return self.router.call(
+            lambda endpoint: transport.post(
+                endpoint,
+                items,
+                params=kwargs.get("endpoint_params", self.endpoint_params),
+                headers=kwargs.get("endpoint_headers", self.endpoint_headers),
+                timeout=self.timeout,
             )
-        return response.json()
+        )
 
     def close(self):
-        if self.requests_session:
-            return self.requests_session.close()
+        super().close()
+        self.router.close()
+        if self.transport:
+            transport, self.transport = self.transport, None
+            release_transport(transport)
 
 
 class AsyncDistantHTTPBatchModel(AsyncModel[ItemType, ReturnType]):
@@ -207,10 +384,16 @@ class AsyncDistantHTTPBatchModel(AsyncModel[ItemType, ReturnType]):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.endpoint = self.model_settings["endpoint"]
+        self.endpoints = _endpoints(self.model_settings["endpoint"])
+        self.endpoint = self.endpoints[0]
+        self.router = make_router(self.endpoints, self.model_settings)
         self.endpoint_headers = self.model_settings.get("endpoint_headers", {})
         self.endpoint_params = self.model_settings.get("endpoint_params", {})
-        self.aiohttp_session: Optional[aiohttp.ClientSession] = None
+        self.transport_settings = HTTPTransportSettings(
+            **self.model_settings.get("transport", {})
+        )
+        acquire_async_transport(self.transport_settings)
+        self._transport_released = False
         self.timeout = self.model_settings.get("timeout", 60)
 
     @retry(
@@ -221,31 +404,18 @@ class AsyncDistantHTTPBatchModel(AsyncModel[ItemType, ReturnType]):
         reraise=SERVICE_MODEL_RETRY_POLICY.reraise,
     )
     async def _predict_batch(self, items, **kwargs):
-        if self.aiohttp_session is None:
-            self.aiohttp_session = aiohttp.ClientSession()
-        try:
-            items = json.dumps(items)
-        except TypeError:
-            # TypeError: Object of type {ItemType} is not JSON serializable
-            # Try converting a list of pydantic models to dict
-            items = json.dumps([item.dict() for item in items])
-
-        async with self.aiohttp_session.post(
-            self.endpoint,
-            params=kwargs.get("endpoint_params", self.endpoint_params),
-            data=items,
-            headers={
-                "content-type": "application/json",
-                **kwargs.get("endpoint_headers", self.endpoint_headers),
-            },
-            timeout=self.timeout,
-        ) as response:
-            if response.status != 200:
-                raise DistantHTTPModelError(
-                    response.status, response.reason, await response.text()
-                )
-            return await response.json()
+        transport = get_async_transport(self.transport_settings)
+        return await self.router.acall(
+            lambda endpoint: transport.post(
+                endpoint,
+                items,
+                params=kwargs.get("endpoint_params", self.endpoint_params),
+                headers=kwargs.get("endpoint_headers", self.endpoint_headers),
+                timeout=self.timeout,
+            )
+        )
 
     async def close(self):
-        if self.aiohttp_session:
-            return self.aiohttp_session.close()
+        if not self._transport_released:
+            self._transport_released = True
+            await release_async_transport(self.transport_settings)
@@ -0,0 +1,316 @@
+import asyncio
+import gzip
+import json
+import threading
+from typing import Any, Dict, Tuple
+
+import aiohttp
+import pydantic
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+
+    has_orjson = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_orjson = False
+
+try:
+    import msgpack
+
+    has_msgpack = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_msgpack = False
+
+BODY_FORMATS = ("json", "orjson", "msgpack")
+
+
+class DistantHTTPModelError(Exception):
+    def __init__(self, status_code, reason, text):
+        super().__init__(f"Service model error [{status_code} {reason}]: {text}")
+        self.status_code = status_code
+
+
+class HTTPTransportSettings(pydantic.BaseModel):
+    """
+    Settings of the connections of distant models, read from the `transport`
+    model setting. Models with the same settings share their connection pools.
+
+    - `pool_size`: connections kept open per host by synchronous models
+    - `keep_alive`: reuse connections between requests, and for how long idle
+        connections are kept open by asynchronous models (in seconds)
+    - `max_connections_per_host`: bound on the concurrent requests of
+        asynchronous models to a host (0 for no bound), HTTP/1.1 requests are
+        not pipelined, so each in-flight request holds a connection
+    - `body`: encoding of the payloads, `orjson` and `msgpack` require the
+        corresponding package
+    - `gzip`: compress the request bodies (responses are always accepted
+        compressed)
+    """
+
+    model_config = pydantic.ConfigDict(frozen=True, extra="forbid")
+
+    pool_size: int = 10
+    keep_alive: bool = True
+    keep_alive_timeout: float = 15
+    max_connections_per_host: int = 0
+    body: str = "json"
+    gzip: bool = False
+
+    @pydantic.field_validator("body")
+    @classmethod
+    def _check_body(cls, v):
+        if v not in BODY_FORMATS:
+            raise ValueError(
+                f"Unknown body format `{v}`, expected one of {', '.join(BODY_FORMATS)}"
+            )
+        if v == "orjson" and not has_orjson:
+            raise ImportError("orjson is not installed, install optimx[orjson].")
+        if v == "msgpack" and not has_msgpack:
+            raise ImportError("msgpack is not installed, install optimx[msgpack].")
+        return v
+
+
+def _default(obj):
+    if isinstance(obj, pydantic.BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class _Codec:
+    def __init__(self, settings: HTTPTransportSettings):
+        self.settings = settings
+        self.headers = {
+            "content-type": (
+                "application/msgpack"
+                if settings.body == "msgpack"
+                else "application/json"
+            ),
+        }
+        if settings.gzip:
+            self.headers["content-encoding"] = "gzip"
+
+    def encode(self, payload: Any) -> bytes:
+        """Encodes the payload, pydantic models included"""
+        if self.settings.body == "orjson":
+            data = orjson.dumps(payload, default=_default)
+        elif self.settings.body == "msgpack":
+            data = msgpack.packb(payload, default=_default)
+        else:
+            data = json.dumps(payload, default=_default).encode()
+        if self.settings.gzip:
+            data = gzip.compress(data)
+        return data
+
+    def decode(self, content: bytes) -> Any:
+        if self.settings.body == "msgpack":
+            return msgpack.unpackb(content)
+        if has_orjson:
+            return orjson.loads(content)
+        return json.loads(content)
+
+
+class HTTPTransport(_Codec):
+    """
+    `requests.Session` shared by the synchronous distant models with the same
+    settings, with a pool of `pool_size` connections per host
+    """
+
+    def __init__(self, settings: HTTPTransportSettings):
+        super().__init__(settings)
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=settings.pool_size, pool_maxsize=settings.pool_size
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        if not settings.keep_alive:
+            self.session.headers["connection"] = "close"
+        self.requests = 0
+        self.users = 0
+
+    def post(
+        self,
+        url: str,
+        payload: Any,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> Any:
+        self.requests += 1
+        response = self.session.post(
+            url,
+            params=params,
+            data=self.encode(payload),
+            headers={**self.headers, **headers},
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            raise DistantHTTPModelError(
+                response.status_code, response.reason, response.text
+            )
+        return self.decode(response.content)
+
+    def stats(self) -> Dict[str, Any]:
+        pools = list(self.adapter.poolmanager.pools._container.values())
+        connections = sum(pool.num_connections for pool in pools)
+        return _stats(self.requests, connections)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHTTPTransport(_Codec):
+    """
+    `aiohttp.ClientSession` shared by the asynchronous distant models with the
+    same settings running on the same event loop
+    """
+
+    def __init__(self, settings: HTTPTransportSettings):
+        super().__init__(settings)
+        self.requests = 0
+        self.connections = 0
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=settings.max_connections_per_host,
+                force_close=not settings.keep_alive,
+                keepalive_timeout=(
+                    settings.keep_alive_timeout if settings.keep_alive else None
+                ),
+            ),
+            trace_configs=[trace_config],
+        )
+
+    async def _on_request_start(self, *args):
+        self.requests += 1
+
+    async def _on_connection_create(self, *args):
+        self.connections += 1
+
+    async def post(
+        self,
+        url: str,
+        payload: Any,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> Any:
+        async with self.session.post(
+            url,
+            params=params,
+            data=self.encode(payload),
+            headers={**self.headers, **headers},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status != 200:
+                raise DistantHTTPModelError(
+                    response.status, response.reason, await response.text()
+                )
+            return self.decode(await response.read())
+
+    def stats(self) -> Dict[str, Any]:
+        return _stats(self.requests, self.connections)
+
+    async def close(self):
+        await self.session.close()
+
+
+def _stats(n_requests: int, connections: int) -> Dict[str, Any]:
+    reused = max(n_requests - connections, 0)
+    return {
+        "requests": n_requests,
+        "connections": connections,
+        "reused_connections": reused,
+        "reuse_ratio": reused / n_requests if n_requests else 0.0,
+    }
+
+
+_lock = threading.Lock()
+_transports: Dict[HTTPTransportSettings, HTTPTransport] = {}
+_async_transports: Dict[
+    Tuple[HTTPTransportSettings, asyncio.AbstractEventLoop], AsyncHTTPTransport
+] = {}
+_async_users: Dict[HTTPTransportSettings, int] = {}
+
+
+def get_transport(settings: HTTPTransportSettings) -> HTTPTransport:
+    with _lock:
+        transport = _transports.get(settings)
+        if transport is None:
+            transport = _transports[settings] = HTTPTransport(settings)
+        transport.users += 1
+        return transport
+
+
+def release_transport(transport: HTTPTransport):
+    """Closes the transport once none of its models use it"""
+    with _lock:
+        transport.users -= 1
+        if transport.users > 0:
+            return
+        if _transports.get(transport.settings) is transport:
+            del _transports[transport.settings]
+    transport.close()
+
+
+def acquire_async_transport(settings: HTTPTransportSettings):
+    """Registers a model using the asynchronous transports of the settings"""
+    with _lock:
+        _async_users[settings] = _async_users.get(settings, 0) + 1
+
+
+def get_async_transport(settings: HTTPTransportSettings) -> AsyncHTTPTransport:
+    """Transport of the running event loop, to look up on each call rather than
+    keep, since sessions are bound to the loop that created them"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        for key in [key for key in _async_transports if key[1].is_closed()]:
+            # the sessions of closed loops cannot be used nor closed anymore
+            del _async_transports[key]
+        transport = _async_transports.get((settings, loop))
+        if transport is None or transport.session.closed:
+            transport = _async_transports[(settings, loop)] = AsyncHTTPTransport(
+                settings
+            )
+        return transport
+
+
+async def release_async_transport(settings: HTTPTransportSettings):
+    """Closes the transports of the settings, on all the event loops, once none
+    of their models use them"""
+    with _lock:
+        _async_users[settings] = _async_users.get(settings, 0) - 1
+        if _async_users[settings] > 0:
+            return
+        del _async_users[settings]
+        transports = {
+            key: _async_transports.pop(key)
+            for key in list(_async_transports)
+            if key[0] == settings
+        }
+    running_loop = asyncio.get_running_loop()
+    for (_, loop), transport in transports.items():
+        if loop is running_loop:
+            await transport.close()
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(transport.close(), loop)
+
+
+def transports_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection reuse of the shared transports"""
+    with _lock:
+        transports = [
+            ("sync", settings, transport) for settings, transport in _transports.items()
+        ] + [
+            ("async", settings, transport)
+            for (settings, _), transport in _async_transports.items()
+        ]
+    return {
+        f"{kind} {settings!r}": transport.stats()
+        for kind, settings, transport in transports
+    }
@@ -0,0 +1,398 @@
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+import aiohttp
+import pydantic
+import requests
+
+from optimx.core.models.http_transport import DistantHTTPModelError
+from optimx.utils.histogram import Histogram
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoints: List[str]):
+        super().__init__(f"Circuit open for all the endpoints: {', '.join(endpoints)}")
+
+
+def endpoint_failure(exception: BaseException) -> bool:
+    """Errors of the endpoint (unreachable, timing out or failing with a 5xx
+    status), as opposed to errors of the request"""
+    if isinstance(exception, DistantHTTPModelError):
+        return exception.status_code >= 500
+    return isinstance(
+        exception,
+        (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            aiohttp.ClientConnectionError,
+            asyncio.TimeoutError,
+        ),
+    )
+
+
+class CircuitBreakerSettings(pydantic.BaseModel):
+    """
+    An endpoint failing `failure_threshold` consecutive times is not called
+    for `reset_timeout_s` seconds, after which a single probe request decides
+    whether it is called again
+    """
+
+    model_config = pydantic.ConfigDict(frozen=True, extra="forbid")
+
+    failure_threshold: int = 5
+    reset_timeout_s: float = 10
+
+
+class HedgingSettings(pydantic.BaseModel):
+    """
+    Requests lasting longer than the `quantile` of the latencies of the last
+    `window` requests (once `min_samples` have been measured) are sent again,
+    to another endpoint when there are several, and the first reply is used.
+    Synchronous models send the requests, once hedging is active, from a pool
+    of `workers` threads. At most a `max_ratio` fraction of the requests are
+    hedged.
+    """
+
+    model_config = pydantic.ConfigDict(frozen=True, extra="forbid")
+
+    quantile: float = 0.95
+    min_delay_ms: float = 1
+    min_samples: int = 20
+    window: int = 1000
+    max_ratio: float = 0.1
+    workers: int = 32
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, settings: CircuitBreakerSettings):
+        self.settings = settings
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if (
+                self.state == self.OPEN
+                and time.monotonic() - self.opened_at >= self.settings.reset_timeout_s
+            ):
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_cancel(self):
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.settings.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+_lock = threading.Lock()
+_breakers: Dict[Tuple[str, CircuitBreakerSettings], CircuitBreaker] = {}
+
+
+def get_circuit_breaker(
+    endpoint: str, settings: CircuitBreakerSettings
+) -> CircuitBreaker:
+    """Circuit breakers are shared by the models calling the same endpoint"""
+    with _lock:
+        breaker = _breakers.get((endpoint, settings))
+        if breaker is None:
+            breaker = _breakers[(endpoint, settings)] = CircuitBreaker(settings)
+        return breaker
+
+
+class _Latencies:
+    """Latency quantile over the last requests, in two rotating windows"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.current = Histogram()
+        self.previous: Optional[Histogram] = None
+        self._lock = threading.Lock()
+
+    def record(self, latency_us: int):
+        self.current.record(latency_us)
+        if self.current.count >= self.window:
+            with self._lock:
+                if self.current.count >= self.window:
+                    self.previous, self.current = self.current, Histogram()
+
+    def quantile(self, q: float, min_samples: int) -> Optional[int]:
+        histogram = self.previous or self.current
+        if histogram.count < min_samples:
+            return None
+        return histogram.quantile(q)
+
+
+class EndpointRouter:
+    """
+    Sends the requests of a distant model to the least loaded of its
+    endpoints whose circuit is closed, fails over to the others when an
+    endpoint fails, and hedges slow requests.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        circuit_breaker: Optional[CircuitBreakerSettings] = None,
+        hedging: Optional[HedgingSettings] = None,
+    ):
+        self.endpoints = endpoints
+        self.breakers = (
+            {e: get_circuit_breaker(e, circuit_breaker) for e in endpoints}
+            if circuit_breaker
+            else {}
+        )
+        self.hedging = hedging
+        self.latencies = _Latencies(hedging.window) if hedging else None
+        self.in_flight = {e: 0 for e in endpoints}
+        self.requests = 0
+        self.hedged = 0
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def _pick(self, tried: Set[str]) -> Optional[str]:
+        offset = next(self._order)
+        candidates = [
+            self.endpoints[(offset + i) % len(self.endpoints)]
+            for i in range(len(self.endpoints))
+        ]
+        for endpoint in sorted(
+            (e for e in candidates if e not in tried), key=self.in_flight.__getitem__
+        ):
+            breaker = self.breakers.get(endpoint)
+            if breaker is None or breaker.allow():
+                return endpoint
+        return None
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not (self.hedging and self.latencies):
+            return None
+        if self.hedged >= self.hedging.max_ratio * max(self.requests, 1):
+            return None
+        latency = self.latencies.quantile(
+            self.hedging.quantile, self.hedging.min_samples
+        )
+        if latency is None:
+            return None
+        return max(latency / 1e6, self.hedging.min_delay_ms / 1000)
+
+    def _started(self, endpoint: str) -> int:
+        with self._lock:
+            self.in_flight[endpoint] += 1
+        return time.perf_counter_ns()
+
+    def _ended(
+        self, endpoint: str, start: int, exception: Optional[BaseException] = None
+    ):
+        with self._lock:
+            self.in_flight[endpoint] -= 1
+        if exception is None and self.latencies:
+            self.latencies.record((time.perf_counter_ns() - start) // 1000)
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            return
+        if isinstance(exception, asyncio.CancelledError):
+            # the slower of hedged requests tells nothing about the endpoint
+            breaker.record_cancel()
+        elif exception is not None and endpoint_failure(exception):
+            breaker.record_failure()
+        else:
+            # errors of the request are replies of the endpoint
+            breaker.record_success()
+
+    def _send(self, endpoint: str, send: Callable[[str], Any]) -> Any:
+        start = self._started(endpoint)
+        try:
+            result = send(endpoint)
+        except BaseException as exc:
+            self._ended(endpoint, start, exc)
+            raise
+        self._ended(endpoint, start)
+        return result
+
+    def _send_hedged(
+        self, endpoint: str, send: Callable[[str], Any], tried: Set[str]
+    ) -> Any:
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._send(endpoint, send)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=cast(HedgingSettings, self.hedging).workers,
+                        thread_name_prefix="optimx-hedging",
+                    )
+        futures = {self._executor.submit(self._send, endpoint, send)}
+        done, _ = concurrent.futures.wait(futures, timeout=delay)
+        if not done:
+            hedge_endpoint = self._pick(tried) or endpoint
+            tried.add(hedge_endpoint)
+            with self._lock:
+                self.hedged += 1
+            futures.add(self._executor.submit(self._send, hedge_endpoint, send))
+        errors = []
+        while futures:
+            done, futures = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    # the slower request completes in the background
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    def call(self, send: Callable[[str], Any]) -> Any:
+        """Calls `send` with endpoints until one of them replies"""
+        with self._lock:
+            self.requests += 1
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                raise error or CircuitOpenError(self.endpoints)
+            tried.add(endpoint)
+            try:
+                return self._send_hedged(endpoint, send, tried)
+            except Exception as exc:
+                if not endpoint_failure(exc):
+                    raise
+                error = exc
+
+    async def _asend(self, endpoint: str, send: Callable[[str], Awaitable[Any]]) -> Any:
+        start = self._started(endpoint)
+        try:
+            result = await send(endpoint)
+        except BaseException as exc:
+            self._ended(endpoint, start, exc)
+            raise
+        self._ended(endpoint, start)
+        return result
+
+    async def _asend_hedged(
+        self, endpoint: str, send: Callable[[str], Awaitable[Any]], tried: Set[str]
+    ) -> Any:
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._asend(endpoint, send)
+        tasks = {asyncio.ensure_future(self._asend(endpoint, send))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedge_endpoint = self._pick(tried) or endpoint
+                tried.add(hedge_endpoint)
+                with self._lock:
+                    self.hedged += 1
+                tasks.add(asyncio.ensure_future(self._asend(hedge_endpoint, send)))
+            errors = []
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def acall(self, send: Callable[[str], Awaitable[Any]]) -> Any:
+        """Asynchronous counterpart of `call`, which cancels the slower of
+        hedged requests"""
+        with self._lock:
+            self.requests += 1
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                raise error or CircuitOpenError(self.endpoints)
+            tried.add(endpoint)
+            try:
+                return await self._asend_hedged(endpoint, send, tried)
+            except Exception as exc:
+                if not endpoint_failure(exc):
+                    raise
+                error = exc
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "in_flight": dict(self.in_flight),
+            "circuits": {e: b.state for e, b in self.breakers.items()},
+        }
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def make_router(
+    endpoints: Union[str, List[str]], model_settings: Dict[str, Any]
+) -> EndpointRouter:
+    """Router of the endpoints of a distant model, configured by the
+    `circuit_breaker` and `hedging` model settings (`True` or a dict)"""
+    circuit_breaker = model_settings.get("circuit_breaker")
+    hedging = model_settings.get("hedging")
+    return EndpointRouter(
+        [endpoints] if isinstance(endpoints, str) else list(endpoints),
+        circuit_breaker=(
+            CircuitBreakerSettings(
+                **({} if circuit_breaker is True else circuit_breaker)
+            )
+            if circuit_breaker
+            else None
+        ),
+        hedging=(
+            HedgingSettings(**({} if hedging is True else hedging)) if hedging else None
+        ),
+    )
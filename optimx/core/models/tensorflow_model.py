@@ -1,7 +1,18 @@
 import abc
+import functools
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple, Type
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
 import aiohttp
 import requests
@@ -13,7 +24,8 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from optimx.core.model import AsyncModel, Model
+from optimx.core import errors
+from optimx.core.model import AsyncModel, Model, _windows
 from optimx.core.types import ItemType, ReturnType
 from optimx.utils.serialization import safe_np_dump
 
@@ -46,6 +58,115 @@ try:
 except ModuleNotFoundError:  # pragma: no cover
     logger.info("numpy is not installed")
 
+try:
+    import orjson
+
+    has_orjson = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_orjson = False
+
+try:
+    import pyarrow as pa
+
+    has_pyarrow = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_pyarrow = False
+
+
+def array_to_tensor_proto(array: "np.ndarray", proto, dtype=None) -> None:
+    """Fills the TensorProto `proto` with `array`, whose buffer is copied once to
+    `tensor_content`, instead of going through Python values"""
+    if dtype is not None:
+        array = array.astype(tf.dtypes.as_dtype(dtype).as_numpy_dtype, copy=False)
+    if array.dtype.kind in "OSU":
+        # strings have no fixed size binary representation
+        proto.CopyFrom(tf.compat.v1.make_tensor_proto(array, dtype=dtype))
+        return
+    proto.dtype = tf.dtypes.as_dtype(array.dtype).as_datatype_enum
+    for size in array.shape:
+        proto.tensor_shape.dim.add(size=size)
+    proto.tensor_content = np.ascontiguousarray(array).tobytes()
+
+
+def tensor_proto_to_array(proto) -> "np.ndarray":
+    """Reads a TensorProto, with a single copy of its content when it is binary"""
+    content = proto.tensor_content
+    if not content:
+        return tf.make_ndarray(proto)
+    # arrays over the bytes of the proto are read-only, predictions are not
+    return (
+        np.frombuffer(content, dtype=tf.dtypes.as_dtype(proto.dtype).as_numpy_dtype)
+        .reshape([dim.size for dim in proto.tensor_shape.dim])
+        .copy()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _zeros(shape: Tuple[int, ...], dtype) -> "np.ndarray":
+    """Read-only block of zeros, shared by the empty rows of columnar predictions"""
+    block = np.zeros(shape, dtype)
+    block.flags.writeable = False
+    return block
+
+
+class ColumnarPredictions(Sequence):
+    """
+    Predictions of a batch of items as whole output arrays, with a row per
+    item, and the `mask` of the empty items, whose rows are zeros.
+
+    Rows are only materialized as dicts when accessed per item, and
+    `to_arrow` converts the predictions to a table.
+    """
+
+    def __init__(self, columns: Dict[str, "np.ndarray"], mask: "np.ndarray"):
+        self.columns = columns
+        self.mask = mask
+
+    def __len__(self) -> int:
+        return len(self.mask)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnarPredictions(
+                {name: column[index] for name, column in self.columns.items()},
+                self.mask[index],
+            )
+        return {name: column[index] for name, column in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, "np.ndarray"]]:
+        names = list(self.columns)
+        return (dict(zip(names, row)) for row in zip(*self.columns.values()))
+
+    def to_arrow(self) -> "pa.Table":
+        """Table with a column per output, in which empty items are nulls and
+        outputs of several dimensions are flattened to fixed size lists"""
+        if not has_pyarrow:
+            raise ImportError("pyarrow is not installed, install optimx[pyarrow].")
+        mask = self.mask if self.mask.any() else None
+        arrays = {}
+        for name, column in self.columns.items():
+            if column.ndim == 1:
+                arrays[name] = pa.array(column, mask=mask)
+            else:
+                arrays[name] = pa.FixedSizeListArray.from_arrays(
+                    pa.array(np.ascontiguousarray(column).reshape(-1)),
+                    int(np.prod(column.shape[1:])),
+                    mask=None if mask is None else pa.array(mask),
+                )
+        return pa.table(arrays)
+
+
+def dumps_inputs(vects: Dict[str, "np.ndarray"]) -> bytes:
+    """JSON body of TF serving REST requests, with arrays serialized natively
+    by orjson when it is installed"""
+    if has_orjson:
+        return orjson.dumps(
+            {"inputs": vects},
+            default=safe_np_dump,
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps({"inputs": vects}, default=safe_np_dump).encode()
+
 
 class TensorflowModelMixin(abc.ABC):
     output_shapes: Dict[str, Tuple]
@@ -67,23 +188,52 @@ class TensorflowModelMixin(abc.ABC):
             for name in self.output_tensor_mapping
         }
 
+    def _stack_items(self, items, mask: List[bool]) -> Dict[str, "np.ndarray"]:
+        if any(mask):
+            items = [item for item, mask_value in zip(items, mask) if not mask_value]
+        return {
+            key: np.stack([item[key] for item in items], axis=0) for key in items[0]
+        }
+
     def _rebuild_predictions_with_mask(
         self, mask: List[bool], predictions: Dict[str, "np.ndarray"]
     ) -> List[Dict[str, Any]]:
         """Merge the just-computed predictions with empty vectors for empty input items.
-        Making sure everything is well-aligned"
+        Making sure everything is well-aligned.
+        Each output array is iterated over once, rather than indexed per item.
         """
-        i = 0
-        results = []
-        for mask_value in mask:
-            if mask_value:
-                results.append(self._generate_empty_prediction())
-            else:
-                results.append(
-                    {name: predictions[name][i] for name in self.output_tensor_mapping}
+        names = list(self.output_tensor_mapping)
+        rows = zip(*(predictions[name] for name in names)) if predictions else iter(())
+        if not any(mask):
+            return [dict(zip(names, row)) for row in rows]
+        return [
+            (
+                self._generate_empty_prediction()
+                if mask_value
+                else dict(zip(names, next(rows)))
+            )
+            for mask_value in mask
+        ]
+
+    def _columnar_predictions(
+        self, mask: List[bool], predictions: Dict[str, "np.ndarray"]
+    ) -> ColumnarPredictions:
+        """Merge the just-computed predictions with zeros for empty input items,
+        in whole output arrays"""
+        mask_array = np.asarray(mask, dtype=bool)
+        columns = {}
+        for name in self.output_tensor_mapping:
+            shape = (len(mask),) + self.output_shapes[name]
+            if not mask_array.any():
+                columns[name] = predictions[name]
+            elif mask_array.all():
+                columns[name] = np.broadcast_to(
+                    _zeros((), self.output_dtypes[name]), shape
                 )
-                i += 1
-        return results
+            else:
+                columns[name] = np.zeros(shape, self.output_dtypes[name])
+                columns[name][~mask_array] = predictions[name]
+        return ColumnarPredictions(columns, mask_array)
 
 
 class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
@@ -145,15 +295,31 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
         mask = [self._is_empty(item) for item in items]
         if all(mask):
             return self._rebuild_predictions_with_mask(mask, {})
-        vects = {
-            key: np.stack(
-                [item[key] for item, mask in zip(items, mask) if not mask], axis=0
-            )
-            for key in items[0]
-        }
+        vects = self._stack_items(items, mask)
         predictions = self._tensorflow_predict(vects)
         return self._rebuild_predictions_with_mask(mask, predictions)
 
+    def predict_columns(self, items: List[ItemType], **kwargs) -> ColumnarPredictions:
+        """Predictions of the items as whole output arrays, without the per item
+        handling of `predict_batch`: items are validated, but predictions are
+        neither validated nor cached"""
+        items = self._validate_batch(
+            items, self._item_model, errors.ItemValidationException
+        )
+        mask = [self._is_empty(item) for item in items]
+        if all(mask):
+            return self._columnar_predictions(mask, {})
+        vects = self._stack_items(items, mask)
+        return self._columnar_predictions(mask, self._tensorflow_predict(vects))
+
+    def predict_columns_gen(
+        self, items: Iterator[ItemType], batch_size: Optional[int] = None, **kwargs
+    ) -> Iterator[ColumnarPredictions]:
+        """Columnar counterpart of `predict_gen`, yielding the predictions of each
+        batch of items"""
+        for batch in _windows(items, batch_size or (self.batch_size or 1)):
+            yield self.predict_columns(batch, **kwargs)
+
     def _tensorflow_predict(
         self, vects: Dict[str, "np.ndarray"], grpc_dtype=None
     ) -> Dict[str, "np.ndarray"]:
@@ -175,9 +341,7 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
         request = PredictRequest()
         request.model_spec.name = self.tf_model_name
         for key, vect in vects.items():
-            request.inputs[key].CopyFrom(
-                tf.compat.v1.make_tensor_proto(vect, dtype=dtype)
-            )
+            array_to_tensor_proto(vect, request.inputs[key], dtype=dtype)
         if not self.grpc_stub:
             self.grpc_stub = connect_tf_serving_grpc(
                 self.tf_model_name,
@@ -187,11 +351,11 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
 
         r = self.grpc_stub.Predict(request, 1)
 
+        n_items = next(iter(vects.values())).shape[0]
         return {
-            output_key: np.array(
-                r.outputs[output_key].ListFields()[-1][1],
-                dtype=self.output_dtypes.get(output_key),
-            ).reshape((vect.shape[0],) + self.output_shapes[output_key])
+            output_key: tensor_proto_to_array(r.outputs[output_key])
+            .astype(self.output_dtypes.get(output_key), copy=False)
+            .reshape((n_items,) + self.output_shapes[output_key])
             for output_key in self.output_tensor_mapping
         }
 
@@ -204,13 +368,15 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
             f"http://{self.service_settings.tf_serving.host}:"
             f"{self.service_settings.tf_serving.port}"
             f"/v1/models/{self.tf_model_name}:predict",
-            data=json.dumps({"inputs": vects}, default=safe_np_dump),
+            data=dumps_inputs(vects),
         )
         if response.status_code != 200:  # pragma: no cover
             raise TFServingError(
                 f"TF Serving error [{response.reason}]: {response.text}"
             )
-        response_json = response.json()
+        response_json = (
+            orjson.loads(response.content) if has_orjson else response.json()
+        )
         outputs = response_json["outputs"]
         if not isinstance(outputs, dict):
             # with some (legacy) models, the output is the result, instead of a dict
@@ -321,15 +487,33 @@ class AsyncTensorflowModel(TensorflowModelMixin, AsyncModel[ItemType, ReturnType
         mask = [self._is_empty(item) for item in items]
         if all(mask):
             return self._rebuild_predictions_with_mask(mask, {})
-        vects = {
-            key: np.stack(
-                [item[key] for item, mask in zip(items, mask) if not mask], axis=0
-            )
-            for key in items[0]
-        }
+        vects = self._stack_items(items, mask)
         predictions = await self._tensorflow_predict(vects)
         return self._rebuild_predictions_with_mask(mask, predictions)
 
+    async def predict_columns(
+        self, items: List[ItemType], **kwargs
+    ) -> ColumnarPredictions:
+        """Predictions of the items as whole output arrays, without the per item
+        handling of `predict_batch`: items are validated, but predictions are
+        neither validated nor cached"""
+        items = self._validate_batch(
+            items, self._item_model, errors.ItemValidationException
+        )
+        mask = [self._is_empty(item) for item in items]
+        if all(mask):
+            return self._columnar_predictions(mask, {})
+        vects = self._stack_items(items, mask)
+        return self._columnar_predictions(mask, await self._tensorflow_predict(vects))
+
+    async def predict_columns_gen(
+        self, items: Iterator[ItemType], batch_size: Optional[int] = None, **kwargs
+    ) -> AsyncIterator[ColumnarPredictions]:
+        """Columnar counterpart of `predict_gen`, yielding the predictions of each
+        batch of items"""
+        for batch in _windows(items, batch_size or (self.batch_size or 1)):
+            yield await self.predict_columns(batch, **kwargs)
+
     async def _tensorflow_predict(
         self, vects: Dict[str, "np.ndarray"]
     ) -> Dict[str, "np.ndarray"]:
@@ -340,13 +524,17 @@ class AsyncTensorflowModel(TensorflowModelMixin, AsyncModel[ItemType, ReturnType
             f"http://{self.service_settings.tf_serving.host}:"
             f"{self.service_settings.tf_serving.port}"
             f"/v1/models/{self.tf_model_name}:predict",
-            data=json.dumps({"inputs": vects}, default=safe_np_dump),
+            data=dumps_inputs(vects),
         ) as response:
             if response.status != 200:  # pragma: no cover
                 raise TFServingError(
                     f"TF Serving error [{response.reason}]: {response.text}"
                 )
-            response_json = await response.json()
+            response_json = (
+                orjson.loads(await response.read())
+                if has_orjson
+                else await response.json()
+            )
         outputs = response_json["outputs"]
         if not isinstance(outputs, dict):
             # with some (legacy) models, the output is the result, instead of a dict
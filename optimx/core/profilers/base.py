@@ -1,7 +1,7 @@
 import typing
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
-from typing import Dict, Generator, Set
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Generator, Set
 
 from optimx.core.model import AsyncModel, Model, WrappedAsyncModel
 
@@ -9,6 +9,10 @@ from optimx.core.model import AsyncModel, Model, WrappedAsyncModel
 class BaseProfiler(ABC):
     """Base Profiler class to be inherited for custom profiler."""
 
+    # whether `profile` can be entered concurrently (from threads or asyncio
+    # tasks), asynchronous models are only profiled by concurrent profilers
+    concurrent: bool = False
+
     def __init__(self, model: Model) -> None:
         self.model = model
         self.main_model_name = self.model.configuration_key
@@ -22,6 +26,21 @@ class BaseProfiler(ABC):
     def end(self, model_name: str) -> None:
         """Define how to record the cost when an action is completed."""
 
+    def record_batch(
+        self, model_name: str, batch_size: int, cache_lookups: int, cache_hits: int
+    ) -> None:
+        """Called for each batch of items predicted by a model, with the number of
+        items it computed, and of items looked up and found in the cache."""
+
+    def record_validation_error(self, model_name: str, error: str) -> None:
+        """Called when the items or the predictions of a model fail validation,
+        with the name of the raised exception."""
+
+    def span(self, model_name: str, name: str) -> ContextManager:
+        """Context manager around a phase of a model call (`cache_lookup`,
+        `validation`, `predict_batch`, `cache_write`)."""
+        return nullcontext()
+
     def summary(self, *args, **kwargs) -> str:  # type: ignore
         """Summary function to be overwritten"""
         return ""
@@ -48,6 +67,7 @@ class BaseProfiler(ABC):
         if isinstance(model, WrappedAsyncModel):
             # let's work on the wrapped model instead of the wrapper
             model = model.async_model
+            model.profiler = self  # type: ignore
         for model_dependency in model.model_dependencies.values():
             self._build(model_dependency)
 
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Generator, List, Optional, Union
+
+from tabulate import tabulate
+
+from optimx.core.model import Model
+from optimx.core.profilers.base import BaseProfiler
+from optimx.utils.histogram import Histogram
+
+
+class ModelStats:
+    """Latencies (in microseconds), batch sizes, cache hits and validation errors
+    of a model"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.batch_size = Histogram(highest_value=2**20)
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.validation_errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record_cache(self, lookups: int, hits: int):
+        with self._lock:
+            self.cache_lookups += lookups
+            self.cache_hits += hits
+
+    def record_validation_error(self, error: str):
+        with self._lock:
+            self.validation_errors[error] += 1
+
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        if not self.cache_lookups:
+            return None
+        return self.cache_hits / self.cache_lookups
+
+
+class HistogramProfiler(BaseProfiler):
+    """Profiler meant to stay enabled in long-running services: the latency of
+    each model call, the number of items each `_predict_batch` call computes
+    and the cache hits are recorded in fixed-size histograms and counters, so
+    that its memory does not grow with the number of calls.
+
+    Calls are timed independently of each other, so that models can be called
+    concurrently from threads and asyncio tasks. Unlike `SimpleProfiler`,
+    net durations of the sub models are not computed.
+
+    Usage:
+        model = optimx.load_model(...)
+        profiler = HistogramProfiler(model)
+        res = model(item)
+        print(profiler.summary(print_table=True))
+    """
+
+    concurrent = True
+
+    def __init__(self, model: Model) -> None:
+        super().__init__(model)
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, ModelStats] = {}
+
+    def _get_stats(self, model_name: str) -> ModelStats:
+        stats = self.stats.get(model_name)
+        if stats is None:
+            with self._stats_lock:
+                stats = self.stats.setdefault(model_name, ModelStats())
+        return stats
+
+    def start(self, model_name: str) -> None:
+        """Calls are timed by `profile`"""
+
+    def end(self, model_name: str) -> None:
+        """Calls are timed by `profile`"""
+
+    @contextmanager
+    def profile(self, model_name: str) -> Generator:  # type: ignore
+        start_time = time.perf_counter_ns()
+        try:
+            yield model_name
+        finally:
+            self._get_stats(model_name).latency.record(
+                (time.perf_counter_ns() - start_time) // 1000
+            )
+
+    def record_batch(
+        self, model_name: str, batch_size: int, cache_lookups: int, cache_hits: int
+    ) -> None:
+        stats = self._get_stats(model_name)
+        if batch_size:
+            stats.batch_size.record(batch_size)
+        if cache_lookups:
+            stats.record_cache(cache_lookups, cache_hits)
+
+    def record_validation_error(self, model_name: str, error: str) -> None:
+        self._get_stats(model_name).record_validation_error(error)
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            self.stats = {}
+
+    def summary(  # type: ignore
+        self, *args, print_table: bool = False, **kwargs  # type: ignore
+    ) -> Union[Dict[str, List], str]:  # type: ignore
+        """Usage
+
+            stat: Dict[str, List] = profiler.summary()
+        or
+            print(profiler.summary(print_table=True, tablefmt="fancy_grid"))
+
+        Durations are in seconds.
+        """
+        result: Dict[str, List] = defaultdict(list)
+        for model_name, stats in sorted(self.stats.items()):
+            latency = stats.latency.summary()
+            result["Name"].append(model_name)
+            result["Num call"].append(latency["count"])
+            for col, key in [
+                ("Mean (s)", "mean"),
+                ("p50 (s)", "p50"),
+                ("p90 (s)", "p90"),
+                ("p99 (s)", "p99"),
+                ("Max (s)", "max"),
+            ]:
+                value = latency[key]
+                result[col].append(value / 1e6 if value is not None else None)
+            result["Mean batch size"].append(stats.batch_size.mean)
+            result["Max batch size"].append(stats.batch_size.max)
+            result["Cache hit ratio"].append(stats.cache_hit_ratio)
+            result["Validation errors"].append(sum(stats.validation_errors.values()))
+        result_sorted = OrderedDict(
+            (col, result[col])
+            for col in [
+                "Name",
+                "Num call",
+                "Mean (s)",
+                "p50 (s)",
+                "p90 (s)",
+                "p99 (s)",
+                "Max (s)",
+                "Mean batch size",
+                "Max batch size",
+                "Cache hit ratio",
+                "Validation errors",
+            ]
+        )
+        if print_table:
+            return tabulate(result_sorted, headers="keys", **kwargs)
+        return result_sorted
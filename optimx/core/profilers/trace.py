@@ -0,0 +1,169 @@
+import collections
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Generator, Iterator, List, Optional, Tuple
+
+from optimx.core.model import Model
+from optimx.core.profilers.base import BaseProfiler
+
+
+class Span:
+    """Timed section of a request: a model call, or one of its phases"""
+
+    __slots__ = ("name", "category", "start", "end", "thread_id", "children")
+
+    def __init__(self, name: str, category: str):
+        self.name = name
+        self.category = category
+        self.start = time.perf_counter_ns()
+        self.end: Optional[int] = None
+        self.thread_id = threading.get_ident()
+        self.children: List["Span"] = []
+
+    @property
+    def duration(self) -> int:
+        """Duration in nanoseconds"""
+        return (self.end or time.perf_counter_ns()) - self.start
+
+    def walk(
+        self, stack: Tuple[str, ...] = ()
+    ) -> Iterator[Tuple[Tuple[str, ...], "Span"]]:
+        stack = stack + (self.name,)
+        yield stack, self
+        for child in self.children:
+            yield from child.walk(stack)
+
+
+# marks requests which are not sampled, so that their sub models are not either
+_UNSAMPLED = Span("", "")
+
+
+class TraceProfiler(BaseProfiler):
+    """This profiler records a tree of spans per request: the calls of the
+    model and of its sub models via 'model_dependencies', and their phases
+    (cache lookups and writes, validation, `_predict_batch`).
+
+    Only a `sample_rate` fraction of the requests is traced, and the last
+    `max_traces` traces are kept, so that it can run on live traffic. Traces
+    can be exported as Chrome trace events (to open in chrome://tracing or
+    Perfetto), or as collapsed stacks to draw flame graphs.
+
+    Spans follow the context of the request, across asyncio tasks and the
+    generators of asynchronous models iterated synchronously, but not across
+    threads started by the models.
+
+    Usage:
+        model = optimx.load_model(...)
+        profiler = TraceProfiler(model, sample_rate=0.01)
+        res = model(item)
+        profiler.dump_chrome_trace("trace.json")
+        open("stacks.txt", "w").write(profiler.collapsed_stacks())
+    """
+
+    concurrent = True
+
+    def __init__(
+        self, model: Model, sample_rate: float = 1.0, max_traces: int = 100
+    ) -> None:
+        super().__init__(model)
+        self.sample_rate = sample_rate
+        self.traces: Deque[Span] = collections.deque(maxlen=max_traces)
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+            f"optimx_trace_{id(self)}", default=None
+        )
+        self._origin = time.perf_counter_ns()
+
+    def start(self, model_name: str) -> None:
+        """Spans are recorded by `profile`"""
+
+    def end(self, model_name: str) -> None:
+        """Spans are recorded by `profile`"""
+
+    @contextmanager
+    def _record(self, parent: Optional[Span], name: str, category: str) -> Generator:
+        span = (
+            _UNSAMPLED
+            if parent is None and random.random() >= self.sample_rate
+            else Span(name, category)
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        finally:
+            try:
+                self._current.reset(token)
+            except ValueError:
+                # the generator is closed from another context
+                self._current.set(parent)
+            if span is not _UNSAMPLED:
+                span.end = time.perf_counter_ns()
+                if parent is None:
+                    self.traces.append(span)
+                else:
+                    parent.children.append(span)
+
+    @contextmanager
+    def profile(self, model_name: str) -> Generator:  # type: ignore
+        parent = self._current.get()
+        if parent is _UNSAMPLED:
+            yield model_name
+            return
+        with self._record(parent, model_name, "model"):
+            yield model_name
+
+    @contextmanager
+    def span(self, model_name: str, name: str) -> Generator:  # type: ignore
+        parent = self._current.get()
+        if parent is None or parent is _UNSAMPLED:
+            # phases are only traced within a traced model call
+            yield name
+            return
+        with self._record(parent, name, "phase"):
+            yield name
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Traces in the Chrome trace event format"""
+        pid = os.getpid()
+        events = []
+        for trace in list(self.traces):
+            for _, span in trace.walk():
+                events.append(
+                    {
+                        "name": span.name,
+                        "cat": span.category,
+                        "ph": "X",
+                        "ts": (span.start - self._origin) / 1000,
+                        "dur": span.duration / 1000,
+                        "pid": pid,
+                        "tid": span.thread_id,
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def collapsed_stacks(self) -> str:
+        """Self time of each stack of spans in microseconds, summed over the
+        traces, one `parent;child;phase <time>` line per stack, as read by
+        flamegraph.pl or speedscope"""
+        self_times: Dict[Tuple[str, ...], int] = collections.defaultdict(int)
+        for trace in list(self.traces):
+            for stack, span in trace.walk():
+                self_times[stack] += max(
+                    span.duration - sum(child.duration for child in span.children),
+                    0,
+                )
+        return "".join(
+            f"{';'.join(stack)} {self_time // 1000}\n"
+            for stack, self_time in self_times.items()
+        )
+
+    def clear(self) -> None:
+        self.traces.clear()
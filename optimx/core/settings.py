@@ -57,11 +57,25 @@ class CacheSettings(ModelkitSettings):
         ),
     )
     # cache_provider: Optional[str] = pydantic.Field(None, env="OPTIMX_CACHE_PROVIDER")
+    # one of optimx.utils.cache_keys.KEY_BUILDERS
+    key_builder: str = pydantic.Field(
+        "pickle",
+        validation_alias=pydantic.AliasChoices(
+            "key_builder", "OPTIMX_CACHE_KEY_BUILDER"
+        ),
+    )
 
 
 class RedisSettings(CacheSettings):
     host: str = pydantic.Field("localhost", env="OPTIMX_CACHE_HOST")
     port: int = pydantic.Field(6379, env="OPTIMX_CACHE_PORT")
+    # size of the connection pool of the asyncio client used by AsyncModels
+    max_connections: Optional[int] = pydantic.Field(
+        None,
+        validation_alias=pydantic.AliasChoices(
+            "max_connections", "OPTIMX_CACHE_MAX_CONNECTIONS"
+        ),
+    )
 
     @pydantic.field_validator("cache_provider")
     def _validate_type(cls, v):
@@ -70,9 +84,40 @@ class RedisSettings(CacheSettings):
         return v
 
 
+class TieredCacheSettings(RedisSettings):
+    # in-process LRU cache checked before redis, asynchronous models have their
+    # own with the same size
+    l1_maxsize: int = pydantic.Field(
+        1024,
+        validation_alias=pydantic.AliasChoices(
+            "l1_maxsize", "OPTIMX_CACHE_L1_MAX_SIZE"
+        ),
+    )
+    l1_ttl: Optional[float] = pydantic.Field(
+        None,
+        validation_alias=pydantic.AliasChoices("l1_ttl", "OPTIMX_CACHE_L1_TTL"),
+    )
+
+    @pydantic.field_validator("cache_provider")
+    def _validate_type(cls, v):
+        if v != "tiered":
+            raise ValueError
+        return v
+
+
 class NativeCacheSettings(CacheSettings):
     implementation: str = pydantic.Field("LRU", env="OPTIMX_CACHE_IMPLEMENTATION")
     maxsize: int = pydantic.Field(128, env="OPTIMX_CACHE_MAX_SIZE")
+    # time to live of the entries in seconds, only supported by the LRU cache
+    ttl: Optional[float] = pydantic.Field(
+        None, validation_alias=pydantic.AliasChoices("ttl", "OPTIMX_CACHE_TTL")
+    )
+    # when set, entries are weighted by their serialized size and `maxsize`
+    # is ignored
+    max_bytes: Optional[int] = pydantic.Field(
+        None,
+        validation_alias=pydantic.AliasChoices("max_bytes", "OPTIMX_CACHE_MAX_BYTES"),
+    )
 
     @pydantic.field_validator("cache_provider")
     def _validate_type(cls, v):
@@ -89,6 +134,10 @@ def cache_settings():
         return RedisSettings()
     except pydantic.ValidationError:
         pass
+    try:
+        return TieredCacheSettings()
+    except pydantic.ValidationError:
+        pass
     try:
         return NativeCacheSettings()
     except pydantic.ValidationError:
@@ -101,11 +150,48 @@ class LibrarySettings(ModelkitSettings):
         None, env="OPTIMX_ASSETS_DIR_OVERRIDE"
     )
     enable_validation: bool = pydantic.Field(True, env="OPTIMX_ENABLE_VALIDATION")
+    warmup: bool = pydantic.Field(
+        False, validation_alias=pydantic.AliasChoices("warmup", "OPTIMX_WARMUP")
+    )
+    assets_watch_interval: Optional[float] = pydantic.Field(
+        None,
+        validation_alias=pydantic.AliasChoices(
+            "assets_watch_interval", "OPTIMX_ASSETS_WATCH_INTERVAL_S"
+        ),
+    )
+    mmap_assets: bool = pydantic.Field(
+        False,
+        validation_alias=pydantic.AliasChoices("mmap_assets", "OPTIMX_MMAP_ASSETS"),
+    )
+    gc_freeze: bool = pydantic.Field(
+        False, validation_alias=pydantic.AliasChoices("gc_freeze", "OPTIMX_GC_FREEZE")
+    )
+    memory_tracker: str = pydantic.Field(
+        "rss",
+        validation_alias=pydantic.AliasChoices(
+            "memory_tracker", "OPTIMX_MEMORY_TRACKER"
+        ),
+    )
+    deep_memory_size: bool = pydantic.Field(
+        False,
+        validation_alias=pydantic.AliasChoices(
+            "deep_memory_size", "OPTIMX_DEEP_MEMORY_SIZE"
+        ),
+    )
+    preload_workers: int = pydantic.Field(
+        1,
+        validation_alias=pydantic.AliasChoices(
+            "preload_workers", "OPTIMX_PRELOAD_WORKERS"
+        ),
+    )
+    metrics: bool = pydantic.Field(
+        False, validation_alias=pydantic.AliasChoices("metrics", "OPTIMX_METRICS")
+    )
     tf_serving: TFServingSettings = pydantic.Field(
         default_factory=lambda: TFServingSettings()
     )
-    cache: Optional[Union[RedisSettings, NativeCacheSettings]] = pydantic.Field(
-        default_factory=lambda: cache_settings()
+    cache: Optional[Union[TieredCacheSettings, RedisSettings, NativeCacheSettings]] = (
+        pydantic.Field(default_factory=lambda: cache_settings())
     )
 
     class Config:
@@ -1,7 +1,14 @@
 import os
 import subprocess
+from concurrent import futures
+from typing import Callable, Dict
 
-from optimx.core.models.tensorflow_model import TensorflowModel, connect_tf_serving
+from optimx.core.models.tensorflow_model import (
+    TensorflowModel,
+    array_to_tensor_proto,
+    connect_tf_serving,
+    tensor_proto_to_array,
+)
 from optimx.utils.tensorflow import deploy_tf_models
 
 
@@ -68,3 +75,53 @@ def tf_serving_fixture(request, lib, tf_version, deployment="docker"):
         8500,
         "grpc",
     )
+
+
+def tf_serving_stand_in(
+    predict: Callable[[str, Dict], Dict],
+    host: str = "localhost",
+    port: int = 0,
+):
+    """
+    Starts an in-process gRPC server answering TF serving `Predict` requests
+    with `predict(model_name, inputs)`, which maps the names of the inputs to
+    numpy arrays and returns those of the outputs, so that the gRPC path of
+    `TensorflowModel` can be tested without TF serving.
+
+    Returns the server, to stop, and its port.
+    """
+    import grpc
+    from tensorflow_serving.apis import prediction_service_pb2_grpc
+    from tensorflow_serving.apis.get_model_metadata_pb2 import (
+        GetModelMetadataResponse,
+    )
+    from tensorflow_serving.apis.predict_pb2 import PredictResponse
+
+    class PredictionService(prediction_service_pb2_grpc.PredictionServiceServicer):
+        def GetModelMetadata(self, request, context):
+            response = GetModelMetadataResponse()
+            response.model_spec.name = request.model_spec.name
+            response.model_spec.version.value = 1
+            return response
+
+        def Predict(self, request, context):
+            outputs = predict(
+                request.model_spec.name,
+                {
+                    name: tensor_proto_to_array(tensor)
+                    for name, tensor in request.inputs.items()
+                },
+            )
+            response = PredictResponse()
+            response.model_spec.name = request.model_spec.name
+            for name, array in outputs.items():
+                array_to_tensor_proto(array, response.outputs[name])
+            return response
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    prediction_service_pb2_grpc.add_PredictionServiceServicer_to_server(
+        PredictionService(), server
+    )
+    port = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    return server, port
@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import functools
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Tuple
+
+from asgiref.sync import AsyncToSync
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+
+
+def _start_loop() -> Tuple[asyncio.AbstractEventLoop, threading.Thread]:
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(
+        target=loop.run_forever, name="optimx-async-bridge", daemon=True
+    )
+    thread.start()
+    return loop, thread
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop running forever in a daemon thread, shared by all the bridges
+    of the process (and restarted in forked children)
+    """
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _thread is None or not _thread.is_alive():
+            _loop, _thread = _start_loop()
+        return _loop
+
+
+def run_sync(func: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+    """
+    Synchronous version of the coroutine function `func`.
+
+    Unlike `AsyncToSync`, which runs each call on a new event loop, calls run
+    on the background event loop, so that the resources bound to an event loop
+    (connection pools of caches and HTTP transports) are reused across calls.
+    Calls from a thread running an event loop are left to `AsyncToSync`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            return AsyncToSync(func)(*args, **kwargs)
+        context = contextvars.copy_context()
+
+        async def _run():
+            # the coroutine runs within the context variables of the caller
+            for var, value in context.items():
+                var.set(value)
+            return await func(*args, **kwargs)
+
+        return asyncio.run_coroutine_threadsafe(_run(), background_loop()).result()
+
+    return wrapper
+
+
+_DONE = object()
+
+
+class _Error:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def iterate_async_gen(agen: AsyncIterator[Any], buffer_size: int = 1) -> Iterator[Any]:
+    """
+    Iterates an asynchronous generator from synchronous code.
+
+    The generator runs on the background event loop, and runs ahead of the
+    caller by at most `buffer_size` results. Closing the returned generator
+    cancels the asynchronous one.
+    """
+    private_thread = None
+    if threading.current_thread() is _thread:
+        # the generator is iterated from a bridged generator, blocking the
+        # shared loop to wait for it would deadlock
+        loop, private_thread = _start_loop()
+    else:
+        loop = background_loop()
+    results: "queue.Queue[Any]" = queue.Queue()
+    credits: Optional[asyncio.Semaphore] = None
+    context = contextvars.copy_context()
+
+    async def _produce():
+        nonlocal credits
+        # the generator runs within the context variables of the caller
+        for var, value in context.items():
+            var.set(value)
+        credits = asyncio.Semaphore(buffer_size)
+        try:
+            async for result in agen:
+                await credits.acquire()
+                results.put(result)
+        except BaseException as exc:
+            results.put(_Error(exc))
+            raise
+        finally:
+            aclose = getattr(agen, "aclose", None)
+            if aclose:
+                await aclose()
+            results.put(_DONE)
+
+    future = asyncio.run_coroutine_threadsafe(_produce(), loop)
+    try:
+        while True:
+            result = results.get()
+            if result is _DONE:
+                return
+            if isinstance(result, _Error):
+                raise result.exc
+            if credits is not None:
+                loop.call_soon_threadsafe(credits.release)
+            yield result
+    finally:
+        if not future.done():
+            future.cancel()
+        if private_thread:
+            loop.call_soon_threadsafe(loop.stop)
+            private_thread.join()
+            loop.close()
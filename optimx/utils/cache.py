@@ -1,16 +1,19 @@
 import abc
-import hashlib
+import asyncio
 import pickle
+import weakref
 from dataclasses import dataclass
-from typing import Any, Dict, Generic, Optional
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Union
 
 import cachetools
-import cachetools.keys
 import pydantic
+from rich.tree import Tree
 
 import optimx
 from optimx.core.types import ItemType
-from optimx.utils.redis import connect_redis
+from optimx.utils.cache_keys import KeyBuilder, make_key_builder, project_item
+from optimx.utils.pretty import describe
+from optimx.utils.redis import async_redis_client, connect_redis
 
 
 @dataclass
@@ -38,19 +41,104 @@ class Cache(abc.ABC):
     def set(self, k: bytes, d: Any):  # pragma: no cover
         ...
 
+    def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        """Resolve the cache status of several items at once.
+        Backends should override this to fetch all keys in a single round-trip."""
+        return [self.get(model_key, item, kwargs) for item in items]
 
-class RedisCache(Cache):
-    def __init__(self, host, port):
-        self.redis = connect_redis(host, port)
-        self.cache_keys = {}
+    def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        """Store several `(cache_key, value)` pairs at once."""
+        for k, d in entries:
+            self.set(k, d)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing the state of the cache"""
+        return {}
+
+    def describe(self, t=None):
+        if not t:
+            t = Tree("")
+        describe(self.stats(), t=t)
+        return t
+
+
+class AsyncCache(abc.ABC):
+    """
+    Cache whose lookups and writes are awaited, so that they do not block
+    the event loop of `AsyncModel`s.
+    """
+
+    @abc.abstractmethod
+    def hash_key(
+        self, model_key: str, item: Any, kwargs: Dict[str, Any]
+    ):  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get(
+        self, model_key: str, item: Any, kwargs: Dict[str, Any]
+    ):  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def set(self, k: bytes, d: Any):  # pragma: no cover
+        ...
+
+    async def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        return [await self.get(model_key, item, kwargs) for item in items]
+
+    async def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        for k, d in entries:
+            await self.set(k, d)
+
+    async def close(self):
+        pass
+
+
+class CacheKeyMixin:
+    """
+    Builds cache keys with a `KeyBuilder`, prefixed by the model key and the
+    optimx version. `key_fields` restricts, per model key, the item fields that
+    are hashed.
+    """
+
+    def _init_keys(self, key_builder: Union[str, KeyBuilder] = "pickle"):
+        self.key_builder: KeyBuilder = (
+            make_key_builder(key_builder)
+            if isinstance(key_builder, str)
+            else key_builder
+        )
+        self.cache_keys: Dict[str, bytes] = {}
+        self.key_fields: Dict[str, Sequence[str]] = {}
+
+    def set_key_fields(self, model_key: str, fields: Sequence[str]):
+        self.key_fields[model_key] = list(fields)
 
     def hash_key(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
         cache_key = self.cache_keys.get(model_key)
         if not cache_key:
             self.cache_keys[model_key] = (model_key + optimx.__version__).encode()
             cache_key = self.cache_keys[model_key]
-        pickled = pickle.dumps((item, kwargs))  # nosec: only used to build a hash
-        return hashlib.sha256(cache_key + pickled).digest()
+        fields = self.key_fields.get(model_key)
+        if fields:
+            item = project_item(item, fields)
+        return self.key_builder.hash(cache_key, item, kwargs)
+
+
+def _redis_dumps(d: Any) -> bytes:
+    if isinstance(d, pydantic.BaseModel):
+        return pickle.dumps(d.dict())
+    return pickle.dumps(d)
+
+
+class RedisCache(CacheKeyMixin, Cache):
+    def __init__(self, host, port, key_builder: Union[str, KeyBuilder] = "pickle"):
+        self.redis = connect_redis(host, port)
+        self._init_keys(key_builder)
 
     def get(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
         cache_key = self.hash_key(model_key, item, kwargs)
@@ -59,35 +147,389 @@ class RedisCache(Cache):
             return CacheItem(item, cache_key, None, True)
         return CacheItem(item, cache_key, pickle.loads(r), False)
 
+    def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        cache_keys = [self.hash_key(model_key, item, kwargs) for item in items]
+        return [
+            (
+                CacheItem(item, cache_key, None, True)
+                if r is None
+                else CacheItem(item, cache_key, r, False)
+            )
+            for item, cache_key, r in zip(
+                items, cache_keys, self.get_values(cache_keys)
+            )
+        ]
+
+    def get_values(self, cache_keys: Sequence[bytes]) -> List[Optional[Any]]:
+        """Fetch the values stored under `cache_keys` (None when missing)"""
+        if not cache_keys:
+            return []
+        return [
+            None if r is None else pickle.loads(r) for r in self.redis.mget(cache_keys)
+        ]
+
     def set(self, k: bytes, d: Any):
-        if isinstance(d, pydantic.BaseModel):
-            self.redis.set(k, pickle.dumps(d.dict()))
-        else:
-            self.redis.set(k, pickle.dumps(d))
+        self.redis.set(k, _redis_dumps(d))
+
+    def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        if not entries:
+            return
+        pipeline = self.redis.pipeline(transaction=False)
+        for k, d in entries:
+            pipeline.set(k, _redis_dumps(d))
+        pipeline.execute()
+
+
+class AsyncRedisCache(CacheKeyMixin, AsyncCache):
+    """
+    Redis cache backed by `redis.asyncio`.
+
+    Connection pools are bound to the event loop that created them, so one
+    client (and pool) is kept per running loop.
+    """
+
+    def __init__(
+        self,
+        host,
+        port,
+        max_connections=None,
+        key_builder: Union[str, KeyBuilder] = "pickle",
+    ):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self._init_keys(key_builder)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
 
+    @property
+    def redis(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = async_redis_client(self.host, self.port, self.max_connections)
+            self._clients[loop] = client
+        return client
+
+    async def get(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
+        cache_key = self.hash_key(model_key, item, kwargs)
+        r = await self.redis.get(cache_key)
+        if r is None:
+            return CacheItem(item, cache_key, None, True)
+        return CacheItem(item, cache_key, pickle.loads(r), False)
 
-class NativeCache(Cache):
+    async def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        if not items:
+            return []
+        cache_keys = [self.hash_key(model_key, item, kwargs) for item in items]
+        return [
+            (
+                CacheItem(item, cache_key, None, True)
+                if r is None
+                else CacheItem(item, cache_key, r, False)
+            )
+            for item, cache_key, r in zip(
+                items, cache_keys, await self.get_values(cache_keys)
+            )
+        ]
+
+    async def get_values(self, cache_keys: Sequence[bytes]) -> List[Optional[Any]]:
+        """Fetch the values stored under `cache_keys` (None when missing)"""
+        if not cache_keys:
+            return []
+        return [
+            None if r is None else pickle.loads(r)
+            for r in await self.redis.mget(cache_keys)
+        ]
+
+    async def set(self, k: bytes, d: Any):
+        await self.redis.set(k, _redis_dumps(d))
+
+    async def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        if not entries:
+            return
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for k, d in entries:
+                pipeline.set(k, _redis_dumps(d))
+            await pipeline.execute()
+
+    async def close(self):
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.connection_pool.disconnect()
+
+
+def serialized_size(d: Any) -> int:
+    """Weight of a cache entry in byte-budget mode"""
+    return len(_redis_dumps(d))
+
+
+def _with_eviction_stats(cache_cls):
+    """Subclass a cachetools cache to count evicted and expired entries"""
+
+    class StatsCache(cache_cls):
+        evictions = 0
+        expirations = 0
+
+        def popitem(self):
+            key_value = super().popitem()
+            self.evictions += 1
+            return key_value
+
+        if hasattr(cache_cls, "expire"):
+
+            def expire(self, time=None):
+                expired = super().expire(time)
+                self.expirations += len(expired)
+                return expired
+
+    StatsCache.__name__ = cache_cls.__name__
+    return StatsCache
+
+
+class NativeCache(CacheKeyMixin, Cache):
     NATIVE_CACHE_IMPLEMENTATIONS = {
-        "LFU": cachetools.LFUCache,
-        "LRU": cachetools.LRUCache,
-        "RR": cachetools.RRCache,
+        "LFU": _with_eviction_stats(cachetools.LFUCache),
+        "LRU": _with_eviction_stats(cachetools.LRUCache),
+        "RR": _with_eviction_stats(cachetools.RRCache),
+    }
+    TTL_CACHE_IMPLEMENTATIONS = {
+        "LRU": _with_eviction_stats(cachetools.TTLCache),
     }
 
-    def __init__(self, implementation, maxsize):
-        self.cache: cachetools.Cache = self.NATIVE_CACHE_IMPLEMENTATIONS[
-            implementation
-        ](maxsize)
-
-    def hash_key(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
-        pickled = pickle.dumps((item, kwargs))  # nosec: only used to build a hash
-        return cachetools.keys.hashkey((model_key, pickled))
+    def __init__(
+        self,
+        implementation,
+        maxsize,
+        key_builder: Union[str, KeyBuilder] = "pickle",
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        :param ttl: time to live of the entries, in seconds
+        :param max_bytes: when set, the cache is bounded by the serialized size
+        of its entries instead of their number
+        """
+        self.implementation = implementation
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        cache_kwargs: Dict[str, Any] = {}
+        if max_bytes:
+            maxsize = max_bytes
+            cache_kwargs["getsizeof"] = serialized_size
+        if ttl:
+            if implementation not in self.TTL_CACHE_IMPLEMENTATIONS:
+                raise ValueError(
+                    f"TTL is not supported by the `{implementation}` cache, "
+                    f"use one of {', '.join(self.TTL_CACHE_IMPLEMENTATIONS)}"
+                )
+            self.cache: cachetools.Cache = self.TTL_CACHE_IMPLEMENTATIONS[
+                implementation
+            ](maxsize, ttl, **cache_kwargs)
+        else:
+            self.cache = self.NATIVE_CACHE_IMPLEMENTATIONS[implementation](
+                maxsize, **cache_kwargs
+            )
+        self.hits = 0
+        self.misses = 0
+        self._init_keys(key_builder)
 
     def get(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
         cache_key = self.hash_key(model_key, item, kwargs)
         r = self.cache.get(cache_key)
         if r is None:
+            self.misses += 1
             return CacheItem(item, cache_key, None, True)
+        self.hits += 1
         return CacheItem(item, cache_key, r, False)
 
+    def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        cache_keys = [self.hash_key(model_key, item, kwargs) for item in items]
+        return [
+            (
+                CacheItem(item, cache_key, None, True)
+                if r is None
+                else CacheItem(item, cache_key, r, False)
+            )
+            for item, cache_key, r in zip(
+                items, cache_keys, self.get_values(cache_keys)
+            )
+        ]
+
+    def get_values(self, cache_keys: Sequence[bytes]) -> List[Optional[Any]]:
+        """Fetch the values stored under `cache_keys` (None when missing)"""
+        values = [self.cache.get(cache_key) for cache_key in cache_keys]
+        n_misses = values.count(None)
+        self.misses += n_misses
+        self.hits += len(values) - n_misses
+        return values
+
     def set(self, k: bytes, d: Any):
-        self.cache.setdefault(k, d)
+        try:
+            self.cache[k] = d
+        except ValueError:
+            # the value alone exceeds the size budget of the cache
+            pass
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # the size of values which cannot be pickled cannot be measured, and
+            # they are not cached rather than failing the prediction
+            pass
+
+    def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        for k, d in entries:
+            self.set(k, d)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "implementation": self.implementation,
+            "ttl": self.ttl,
+            "entries": len(self.cache),
+            "size": self.cache.currsize,
+            "maxsize": self.cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": getattr(self.cache, "evictions", 0),
+            "expirations": getattr(self.cache, "expirations", 0),
+        }
+
+
+class TieredCache(CacheKeyMixin, Cache):
+    """
+    Two-level cache: a bounded in-process `NativeCache` (L1) in front of a
+    `RedisCache` (L2).
+
+    Lookups check L1 first and fetch the remaining keys from L2 in a single
+    call, promoting L2 hits into L1. Writes go through to both levels. Keys are
+    built once by the tiered cache and used as is by both levels.
+    """
+
+    def __init__(
+        self,
+        l1: NativeCache,
+        l2: RedisCache,
+        key_builder: Union[str, KeyBuilder] = "pickle",
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._init_keys(key_builder)
+
+    def get(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
+        return self.get_many(model_key, [item], kwargs)[0]
+
+    def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        cache_keys = [self.hash_key(model_key, item, kwargs) for item in items]
+        values = self.l1.get_values(cache_keys)
+        l1_missing = [
+            cache_key for cache_key, r in zip(cache_keys, values) if r is None
+        ]
+        if l1_missing:
+            l2_values = dict(zip(l1_missing, self.l2.get_values(l1_missing)))
+            promoted = [(k, r) for k, r in l2_values.items() if r is not None]
+            self.l1.set_many(promoted)
+            self.l2_hits += len(promoted)
+            self.l2_misses += len(l2_values) - len(promoted)
+            values = [
+                l2_values[cache_key] if r is None else r
+                for cache_key, r in zip(cache_keys, values)
+            ]
+        return [
+            (
+                CacheItem(item, cache_key, None, True)
+                if r is None
+                else CacheItem(item, cache_key, r, False)
+            )
+            for item, cache_key, r in zip(items, cache_keys, values)
+        ]
+
+    def set(self, k: bytes, d: Any):
+        self.set_many([(k, d)])
+
+    def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        self.l2.set_many(entries)
+        self.l1.set_many(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1": self.l1.stats(),
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+        }
+
+
+class AsyncTieredCache(CacheKeyMixin, AsyncCache):
+    """
+    Asynchronous counterpart of `TieredCache`, with an `AsyncRedisCache` as L2.
+    Only the L2 is awaited.
+    """
+
+    def __init__(
+        self,
+        l1: NativeCache,
+        l2: AsyncRedisCache,
+        key_builder: Union[str, KeyBuilder] = "pickle",
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._init_keys(key_builder)
+
+    async def get(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
+        return (await self.get_many(model_key, [item], kwargs))[0]
+
+    async def get_many(
+        self, model_key: str, items: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> List[CacheItem]:
+        cache_keys = [self.hash_key(model_key, item, kwargs) for item in items]
+        values = self.l1.get_values(cache_keys)
+        l1_missing = [
+            cache_key for cache_key, r in zip(cache_keys, values) if r is None
+        ]
+        if l1_missing:
+            l2_values = dict(zip(l1_missing, await self.l2.get_values(l1_missing)))
+            promoted = [(k, r) for k, r in l2_values.items() if r is not None]
+            self.l1.set_many(promoted)
+            self.l2_hits += len(promoted)
+            self.l2_misses += len(l2_values) - len(promoted)
+            values = [
+                l2_values[cache_key] if r is None else r
+                for cache_key, r in zip(cache_keys, values)
+            ]
+        return [
+            (
+                CacheItem(item, cache_key, None, True)
+                if r is None
+                else CacheItem(item, cache_key, r, False)
+            )
+            for item, cache_key, r in zip(items, cache_keys, values)
+        ]
+
+    async def set(self, k: bytes, d: Any):
+        await self.set_many([(k, d)])
+
+    async def set_many(self, entries: Sequence[Tuple[bytes, Any]]):
+        await self.l2.set_many(entries)
+        self.l1.set_many(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1": self.l1.stats(),
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+        }
+
+    async def close(self):
+        await self.l2.close()
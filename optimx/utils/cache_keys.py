@@ -0,0 +1,183 @@
+import abc
+import hashlib
+import math
+import pickle
+from typing import Any, Callable, Dict, Sequence, Union
+
+import pydantic
+
+try:
+    import numpy as np
+
+    has_numpy = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_numpy = False
+
+try:
+    import orjson
+
+    has_orjson = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_orjson = False
+
+try:
+    import xxhash
+
+    has_xxhash = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_xxhash = False
+
+
+class KeyBuilder(abc.ABC):
+    """
+    Builds the cache key of an item from the model prefix, the item and the
+    keyword arguments of the call.
+    """
+
+    @abc.abstractmethod
+    def hash(
+        self, prefix: bytes, item: Any, kwargs: Dict[str, Any]
+    ) -> bytes:  # pragma: no cover
+        ...
+
+
+class PickleKeyBuilder(KeyBuilder):
+    """sha256 of the pickled `(item, kwargs)`, the historical optimx cache key"""
+
+    def hash(self, prefix: bytes, item: Any, kwargs: Dict[str, Any]) -> bytes:
+        pickled = pickle.dumps((item, kwargs))  # nosec: only used to build a hash
+        return hashlib.sha256(prefix + pickled).digest()
+
+
+class CanonicalKeyBuilder(KeyBuilder):
+    """
+    Hash of a canonical encoding of `(item, kwargs)`.
+
+    Unlike pickle, the encoding does not depend on the python version nor on the
+    insertion order of dicts and sets. Strings, bytes and numpy arrays are hashed
+    straight from their buffers, other items are encoded with orjson with sorted
+    keys, after tagging the values JSON does not tell apart (non-finite floats,
+    big ints, tuples, sets, bytes, arrays and dicts with non-string keys).
+    """
+
+    ALGORITHMS = ("sha256", "blake2b", "xxh3_128")
+
+    def __init__(self, algorithm: str = "sha256"):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(
+                f"Unknown hash algorithm `{algorithm}`, "
+                f"expected one of {', '.join(self.ALGORITHMS)}"
+            )
+        if not has_orjson:
+            raise ImportError("orjson is not installed, install optimx[orjson].")
+        if algorithm == "xxh3_128" and not has_xxhash:
+            raise ImportError("xxhash is not installed, install optimx[xxhash].")
+        self.algorithm = algorithm
+
+    def hash(self, prefix: bytes, item: Any, kwargs: Dict[str, Any]) -> bytes:
+        if self.algorithm == "xxh3_128":
+            h = xxhash.xxh3_128()
+        else:
+            h = hashlib.new(self.algorithm)
+        # each part is prefixed with its length, so that the boundaries between
+        # the prefix, the item and the kwargs cannot be shifted
+        _update(h, prefix)
+        if isinstance(item, str):
+            _update(h, b"s")
+            _update(h, item.encode())
+        elif isinstance(item, (bytes, bytearray)):
+            _update(h, b"b")
+            _update(h, item)
+        elif has_numpy and isinstance(item, np.ndarray) and not item.dtype.hasobject:
+            _update(h, b"a" + item.dtype.str.encode() + repr(item.shape).encode())
+            _update(h, memoryview(np.ascontiguousarray(item)).cast("B"))
+        else:
+            _update(h, b"j")
+            _update(h, _dumps(item))
+        _update(h, _dumps(kwargs) if kwargs else b"")
+        return h.digest()
+
+
+def _update(h: Any, data: Union[bytes, bytearray, memoryview]):
+    h.update(len(data).to_bytes(8, "little"))
+    h.update(data)
+
+
+# Values that JSON cannot represent, or would confuse with others, are encoded
+# as single-key dicts whose key starts with `_TAG`; the keys of the dicts of the
+# items starting with `_TAG` are escaped so that they cannot be taken for a tag.
+_TAG = "\x00"
+_INT_RANGE = range(-(2**63), 2**63)
+
+
+def _dumps(obj: Any) -> bytes:
+    return orjson.dumps(_tagged(obj), option=orjson.OPT_SORT_KEYS)
+
+
+def _tagged(obj: Any) -> Any:
+    """Lossless JSON-compatible form of `obj`"""
+    if obj is None or isinstance(obj, (str, bool)):
+        return obj
+    if isinstance(obj, int):
+        return int(obj) if obj in _INT_RANGE else {_TAG + "int": str(obj)}
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else {_TAG + "float": repr(obj)}
+    if isinstance(obj, list):
+        return [_tagged(x) for x in obj]
+    if isinstance(obj, tuple):
+        return {_TAG + "tuple": [_tagged(x) for x in obj]}
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {
+                (_TAG + k if k.startswith(_TAG) else k): _tagged(v)
+                for k, v in obj.items()
+            }
+        # keys of any type, sorted by their encoding
+        return {
+            _TAG
+            + "dict": sorted([_dumps(k).decode(), _tagged(v)] for k, v in obj.items())
+        }
+    if isinstance(obj, (set, frozenset)):
+        return {_TAG + "set": sorted(_dumps(x).decode() for x in obj)}
+    if isinstance(obj, (bytes, bytearray)):
+        return {_TAG + "bytes": obj.hex()}
+    if isinstance(obj, pydantic.BaseModel):
+        return _tagged(obj.model_dump())
+    if has_numpy and isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            return {_TAG + "array": ["O", obj.shape, _tagged(obj.tolist())]}
+        return {
+            _TAG
+            + "array": [
+                obj.dtype.str,
+                obj.shape,
+                np.ascontiguousarray(obj).tobytes().hex(),
+            ]
+        }
+    if has_numpy and isinstance(obj, np.generic):
+        return _tagged(obj.item())
+    # no canonical form is known for this type
+    return {_TAG + "pickle": pickle.dumps(obj).hex()}
+
+
+def project_item(item: Any, fields: Sequence[str]) -> Dict[str, Any]:
+    """Restrict an item to the fields that are relevant to build its cache key"""
+    if isinstance(item, dict):
+        return {field: item.get(field) for field in fields}
+    return {field: getattr(item, field, None) for field in fields}
+
+
+KEY_BUILDERS: Dict[str, Callable[[], KeyBuilder]] = {
+    "pickle": PickleKeyBuilder,
+    "canonical": CanonicalKeyBuilder,
+    "canonical_xxhash": lambda: CanonicalKeyBuilder(algorithm="xxh3_128"),
+}
+
+
+def make_key_builder(name: str) -> KeyBuilder:
+    if name not in KEY_BUILDERS:
+        raise ValueError(
+            f"Unknown cache key builder `{name}`, "
+            f"expected one of {', '.join(KEY_BUILDERS)}"
+        )
+    return KEY_BUILDERS[name]()
@@ -0,0 +1,86 @@
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+EXECUTORS = ("thread", "process")
+
+# model held by the workers of a process pool
+_worker_model: Any = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _predict_shard(items: List[Any], kwargs: Dict[str, Any]) -> List[Any]:
+    return _worker_model._predict_batch(items, **kwargs)
+
+
+class BatchExecutor:
+    """
+    Shards batches across a pool of threads or processes, each calling the
+    model's `_predict_batch` on its shard, and reassembles the results in order.
+
+    The pool is created on first use, so that process workers are forked from
+    the process that serves predictions with the model already loaded (the
+    model is pickled instead where fork is not available).
+    """
+
+    def __init__(self, executor: str = "process", workers: Optional[int] = None):
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor `{executor}`, "
+                f"expected one of {', '.join(EXECUTORS)}"
+            )
+        self.executor = executor
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[concurrent.futures.Executor] = None
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # pools are not shared with copies of the model
+        return (BatchExecutor, (self.executor, self.workers))
+
+    def _get_pool(self, model) -> concurrent.futures.Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.executor == "thread":
+                        self._pool = concurrent.futures.ThreadPoolExecutor(
+                            max_workers=self.workers
+                        )
+                    else:
+                        methods = multiprocessing.get_all_start_methods()
+                        self._pool = concurrent.futures.ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context(
+                                "fork" if "fork" in methods else None
+                            ),
+                            initializer=_init_worker,
+                            initargs=(model,),
+                        )
+        return self._pool
+
+    def predict_batch(
+        self, model, items: List[Any], kwargs: Dict[str, Any]
+    ) -> List[Any]:
+        if len(items) < 2 or self.workers < 2:
+            return model._predict_batch(items, **kwargs)
+        pool = self._get_pool(model)
+        shard_size = -(-len(items) // self.workers)
+        shards = [items[i : i + shard_size] for i in range(0, len(items), shard_size)]
+        if self.executor == "thread":
+            futures = [
+                pool.submit(model._predict_batch, shard, **kwargs) for shard in shards
+            ]
+        else:
+            futures = [pool.submit(_predict_shard, shard, kwargs) for shard in shards]
+        return [result for future in futures for result in future.result()]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
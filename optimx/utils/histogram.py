@@ -0,0 +1,123 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class Histogram:
+    """
+    Fixed-size histogram of non-negative integers, with logarithmic buckets
+    split linearly in `2 ** precision_bits` sub-buckets (as HdrHistogram does),
+    so that quantiles are reported with a relative error below
+    `2 ** (1 - precision_bits)` whatever the number of recorded values.
+
+    Values above `highest_value` are counted in the last bucket. Recording is
+    thread-safe.
+    """
+
+    def __init__(self, highest_value: int = 2**36, precision_bits: int = 7):
+        self.highest_value = highest_value
+        self.precision_bits = precision_bits
+        self._sub_buckets = 1 << precision_bits
+        self._half = self._sub_buckets >> 1
+        self._counts: List[int] = [0] * (self._index(highest_value) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_buckets:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return (
+            self._sub_buckets + (shift - 1) * self._half + (value >> shift) - self._half
+        )
+
+    def _upper_bound(self, index: int) -> int:
+        """Highest value counted in the bucket"""
+        if index < self._sub_buckets:
+            return index
+        shift, offset = divmod(index - self._sub_buckets, self._half)
+        shift += 1
+        return ((offset + self._half + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1):
+        value = max(int(value), 0)
+        index = min(self._index(value), len(self._counts) - 1)
+        with self._lock:
+            self._counts[index] += count
+            self.count += count
+            self.total += value * count
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """Upper bound and count of the non-empty buckets"""
+        for index, count in enumerate(self._counts):
+            if count:
+                yield self._upper_bound(index), count
+
+    def cumulative_counts(self, bounds: List[int]) -> List[int]:
+        """Numbers of recorded values below each of the sorted `bounds`, up to
+        the precision of the buckets"""
+        with self._lock:
+            counts = list(self._counts)
+        results = []
+        cumulative = 0
+        index = 0
+        for bound in bounds:
+            last = min(self._index(bound), len(counts) - 1)
+            while index <= last:
+                cumulative += counts[index]
+                index += 1
+            results.append(cumulative)
+        return results
+
+    def quantiles(self, *qs: float) -> List[Optional[int]]:
+        """Values below which lie the fractions `qs` of the recorded values,
+        computed in a single pass"""
+        with self._lock:
+            counts = list(self._counts)
+            n, highest = self.count, self.max
+        if not n:
+            return [None] * len(qs)
+        targets = sorted((max(1, round(q * n)), i) for i, q in enumerate(qs))
+        results: List[Optional[int]] = [None] * len(qs)
+        cumulative = 0
+        t = 0
+        for index, count in enumerate(counts):
+            cumulative += count
+            while t < len(targets) and cumulative >= targets[t][0]:
+                results[targets[t][1]] = min(self._upper_bound(index), highest)
+                t += 1
+            if t == len(targets):
+                break
+        return results
+
+    def quantile(self, q: float) -> Optional[int]:
+        return self.quantiles(q)[0]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = None
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        p50, p90, p99 = self.quantiles(0.5, 0.9, 0.99)
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": self.max,
+        }
@@ -1,33 +1,117 @@
-import platform
+import os
+import sys
 import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+import psutil
 
-# 'resource' isn't supported on Windows
 try:
-    import resource
+    import numpy as np
+
+    has_numpy = True
 except ModuleNotFoundError:  # pragma: no cover
-    # the `Windows` case is tested, but not that
-    # from which coverage is gathered which runs on ubuntu
-    pass
+    has_numpy = False
+
+MEMORY_TRACKERS = ("rss", "uss", "tracemalloc")
 
 
 class PerformanceTracker:
-    def __init__(self) -> None:
-        self.increment = None
+    """
+    Measures the time spent in a block, and the memory it allocated:
+
+    - `rss`: difference of the current resident set size of the process
+    - `uss`: difference of the memory private to the process, which excludes
+        pages shared with other processes, slower to measure
+    - `tracemalloc`: difference of the memory allocated by python and by the
+        libraries reporting to tracemalloc (e.g. numpy), which does not depend
+        on when the allocator returns memory to the system. Tracing is started
+        if needed, and slows down all allocations.
+
+    Unlike the `ru_maxrss` high-water mark, these measures do not report 0 for a
+    block loaded after a bigger one. `increment` is in bytes, and can be negative
+    when the block frees more memory than it allocates. It stays `None` when
+    `memory` is `None`, in which case only the time is measured.
+    """
+
+    def __init__(self, memory: Optional[str] = "rss") -> None:
+        if memory is not None and memory not in MEMORY_TRACKERS:
+            raise ValueError(
+                f"Unknown memory tracker `{memory}`, "
+                f"expected one of {', '.join(MEMORY_TRACKERS)}"
+            )
+        self.memory = memory
+        self.increment: Optional[int] = None
+
+    def _measure(self) -> int:
+        if self.memory == "tracemalloc":
+            return tracemalloc.get_traced_memory()[0]
+        process = psutil.Process()
+        if self.memory == "uss":
+            return process.memory_full_info().uss
+        return process.memory_info().rss
 
     def __enter__(self):
+        if self.memory == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
         self.start_time = time.perf_counter()
-        # the `Windows` case is tested, but not that
-        # from which coverage is gathered which runs on ubuntu
-        if platform.system() == "Windows":  # pragma: no cover
-            return self
-        self.pre_maxrss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if self.memory:
+            self.pre_memory = self._measure()
         return self
 
     def __exit__(self, *args):
         self.time = time.perf_counter() - self.start_time
-        # the `Windows` case is tested, but not that
-        # from which coverage is gathered which runs on ubuntu
-        if platform.system() == "Windows":  # pragma: no cover
-            return
-        post_maxrss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
-        self.increment = post_maxrss_bytes - self.pre_maxrss_bytes
+        if self.memory:
+            self.increment = self._measure() - self.pre_memory
+
+
+def deep_getsizeof(*objs: Any) -> int:
+    """
+    Size in bytes of objects and of all the objects they reference, each
+    counted once. The buffers of numpy arrays are counted only when the array
+    owns them, so that views and memory-mapped arrays count for their header.
+    Modules, classes and functions are not followed.
+    """
+    seen = set()
+    size = 0
+    stack = list(objs)
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _NOT_FOLLOWED):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if has_numpy and isinstance(o, np.ndarray):
+            # numpy only counts the buffer of arrays owning their data
+            if o.dtype.hasobject:
+                stack.extend(o.ravel().tolist())
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        if hasattr(o, "__dict__"):
+            stack.append(vars(o))
+        for slot in getattr(type(o), "__slots__", ()):
+            if hasattr(o, slot):
+                stack.append(getattr(o, slot))
+    return size
+
+
+_NOT_FOLLOWED = (type, type(sys), type(deep_getsizeof), type(len))
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Resident memory of a process, in bytes, split between the pages it shares
+    with other processes (e.g. pre-forked workers) and its private pages.
+    """
+    info = psutil.Process(pid or os.getpid()).memory_full_info()
+    private = getattr(info, "uss", info.rss)
+    return {
+        "rss": info.rss,
+        "pss": getattr(info, "pss", info.rss),
+        "shared": info.rss - private,
+        "private": private,
+    }
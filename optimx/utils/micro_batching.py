@@ -0,0 +1,173 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+def _check_predictions(items: List[Any], predictions: List[Any]):
+    if len(predictions) != len(items):
+        raise ValueError(
+            f"predict_batch returned {len(predictions)} predictions "
+            f"for {len(items)} items"
+        )
+
+
+class MicroBatcher:
+    """
+    Gathers items submitted concurrently from several threads, and predicts
+    them with a single call to `predict_batch`, once `max_batch_size` items
+    are waiting or the oldest of them has waited for `max_wait_ms`.
+
+    `submit` returns a `concurrent.futures.Future`, which can be awaited from
+    an event loop with `asyncio.wrap_future`.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[Tuple[Any, concurrent.futures.Future]]]" = (
+            queue.Queue()
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> concurrent.futures.Future:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            m = self._queue.get()
+            if m is None:
+                return
+            batch = [m]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    m = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if m is None:
+                    self._predict(batch)
+                    return
+                batch.append(m)
+            self._predict(batch)
+
+    def _predict(self, batch: List[Tuple[Any, concurrent.futures.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            predictions = self.predict_batch(items)
+            _check_predictions(items, predictions)
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                return
+            # predict the items one by one, so that only the failing ones fail
+            logger.debug("Micro-batch failed, predicting its items alone", error=exc)
+            for m in batch:
+                self._predict([m])
+            return
+        except BaseException as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+class AsyncMicroBatcher:
+    """
+    Asynchronous counterpart of `MicroBatcher`, for models whose
+    `predict_batch` is a coroutine. Batches are gathered and predicted on the
+    running event loop.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: "set[asyncio.Task]" = set()
+
+    async def predict(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._predict(batch))
+            # keep a reference to the task until it is done
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _predict(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            predictions = await self.predict_batch(items)
+            _check_predictions(items, predictions)
+        except Exception as exc:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(exc)
+                return
+            # predict the items one by one, so that only the failing ones fail
+            logger.debug("Micro-batch failed, predicting its items alone", error=exc)
+            for m in batch:
+                await self._predict([m])
+            return
+        except BaseException as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            raise
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    async def close(self):
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
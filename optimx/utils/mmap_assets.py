@@ -0,0 +1,47 @@
+"""
+Read-only memory-mapped loading of array-backed assets.
+
+Memory-mapped assets live in the page cache instead of the Python heap, so
+workers forked after loading them keep sharing the same physical pages,
+whereas objects deserialized onto the heap are progressively copied by
+reference count updates.
+"""
+
+from typing import Any
+
+try:
+    import numpy as np
+
+    has_numpy = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_numpy = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    has_pyarrow = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_pyarrow = False
+
+
+def load_array(path: str, mmap: bool = True) -> Any:
+    """Loads a `.npy` array, memory-mapped read-only when `mmap` is set"""
+    if not has_numpy:
+        raise ImportError("numpy is not installed, install optimx[numpy].")
+    return np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+
+
+def load_arrow_table(path: str, mmap: bool = True) -> Any:
+    """
+    Loads a table stored in the Arrow IPC file format. When `mmap` is set, the
+    columns are zero-copy views over the memory-mapped file.
+    """
+    if not has_pyarrow:
+        raise ImportError("pyarrow is not installed, install optimx[pyarrow].")
+    if mmap:
+        source = pa.memory_map(path, "r")
+    else:
+        with open(path, "rb") as f:
+            source = pa.BufferReader(f.read())
+    return pa.ipc.open_file(source).read_all()
@@ -0,0 +1,112 @@
+import collections
+import concurrent.futures
+import threading
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from optimx.utils.cache import CacheItem
+
+
+class CacheIOWorker:
+    """
+    Background thread running the cache IO of the prediction streams of a model.
+
+    The thread is created on first use and shared by the streams, whose
+    lookups and writes all run in submission order.
+    """
+
+    def __init__(self):
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # threads are not shared with copies of the model
+        return (CacheIOWorker, ())
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> concurrent.futures.Future:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="optimx-cache-io"
+                    )
+        return self._pool.submit(fn, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class CacheIOPipeline:
+    """
+    Runs the cache lookups and writes of a prediction stream on a background
+    thread, so that they overlap with the computation of the current window.
+
+    Lookups run at most `depth` windows ahead of the computation, and at most
+    `depth` windows of writes are pending. Both run in submission order on the
+    thread of the model's `CacheIOWorker`, so that the cache is never accessed
+    concurrently.
+
+    Since the lookup of a window runs before the writes of the previous ones,
+    its misses are completed with the entries written in the meantime.
+    """
+
+    def __init__(self, worker: CacheIOWorker, depth: int = 1):
+        self.depth = depth
+        self._worker = worker
+        self._writes: Deque[concurrent.futures.Future] = collections.deque()
+        # Entries of the writes submitted after the pending lookups, by number
+        self._n_writes = 0
+        self._written: Deque[Tuple[int, Dict[bytes, Any]]] = collections.deque()
+
+    def lookups(
+        self,
+        windows: Iterator[List[Any]],
+        get_cache_items: Callable[[List[Any]], List[CacheItem]],
+    ) -> Iterator[CacheItem]:
+        lookups: Deque[Tuple[concurrent.futures.Future, int]] = collections.deque()
+        for window in windows:
+            lookups.append(
+                (self._worker.submit(get_cache_items, window), self._n_writes)
+            )
+            if len(lookups) > self.depth:
+                yield from self._complete(*lookups.popleft(), lookups)
+        while lookups:
+            yield from self._complete(*lookups.popleft(), lookups)
+
+    def _complete(
+        self,
+        lookup: concurrent.futures.Future,
+        n_writes: int,
+        pending: Deque[Tuple[concurrent.futures.Future, int]],
+    ) -> List[CacheItem]:
+        cache_items = lookup.result()
+        for cache_item in cache_items:
+            if not (cache_item.missing and cache_item.cache_key):
+                continue
+            for n, entries in self._written:
+                if n >= n_writes and cache_item.cache_key in entries:
+                    cache_item.cache_value = entries[cache_item.cache_key]
+                    cache_item.missing = False
+                    break
+        # the following lookups only need the writes submitted after them
+        oldest = pending[0][1] if pending else self._n_writes
+        while self._written and self._written[0][0] < oldest:
+            self._written.popleft()
+        return cache_items
+
+    def write(
+        self,
+        set_many: Callable[[Sequence[Tuple[bytes, Any]]], None],
+        entries: Sequence[Tuple[bytes, Any]],
+    ):
+        self._written.append((self._n_writes, dict(entries)))
+        self._n_writes += 1
+        self._writes.append(self._worker.submit(set_many, entries))
+        while len(self._writes) > self.depth:
+            self._writes.popleft().result()
+
+    def close(self):
+        """Waits for the pending writes, and raises their errors"""
+        while self._writes:
+            self._writes.popleft().result()
@@ -13,11 +13,16 @@ def describe(obj, t=None):
     if not t:
         t = Tree("")
 
-    if hasattr(obj, "__fields__"):
-        for field_name, field in obj.__fields__.items():
+    # pydantic 2 models have `model_fields`, pydantic 1 models `__fields__`
+    fields = getattr(type(obj), "model_fields", None) or getattr(
+        obj, "__fields__", None
+    )
+    if fields is not None and not isinstance(obj, type):
+        for field_name, field in fields.items():
             sub_t = t.add(
                 f"[deep_sky_blue1]{field_name}[/deep_sky_blue1] [dim]: "
-                f"{pretty_print_type(field.outer_type_)}[/dim]"
+                f"{pretty_print_type(getattr(field, 'outer_type_', field.annotation))}"
+                "[/dim]"
             )
             describe(getattr(obj, field_name), t=sub_t)
     elif isinstance(obj, dict):
@@ -1,3 +1,9 @@
+import functools
+from typing import List
+
+import pydantic
+
+
 def construct_recursive(cls, _fields_set=None, **values):
     # https://github.com/samuelcolvin/pydantic/issues/1168
     m = cls.__new__(cls)
@@ -30,3 +36,47 @@ def construct_recursive(cls, _fields_set=None, **values):
     object.__setattr__(m, "__fields_set__", _fields_set)
     m._init_private_attributes()
     return m
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_type_adapter(typ):
+    return _type_adapter(typ)
+
+
+def _type_adapter(typ):
+    try:
+        return pydantic.TypeAdapter(
+            typ, config=pydantic.ConfigDict(arbitrary_types_allowed=True)
+        )
+    except pydantic.PydanticUserError:
+        # BaseModels, dataclasses and TypedDicts carry their own config
+        return pydantic.TypeAdapter(typ)
+
+
+def type_adapter(typ):
+    """Build a pydantic TypeAdapter, shared between all users of the same type"""
+    try:
+        return _cached_type_adapter(typ)
+    except TypeError:
+        # unhashable type
+        return _type_adapter(typ)
+
+
+class TypeValidator:
+    """
+    Validates values, or whole lists of values, against a type using compiled
+    pydantic `TypeAdapter`s instead of instantiating a wrapper model per value.
+    """
+
+    def __init__(self, typ):
+        self.typ = typ
+        self.adapter = type_adapter(typ)
+        self._list_adapter = None
+
+    def validate(self, value):
+        return self.adapter.validate_python(value)
+
+    def validate_many(self, values):
+        if self._list_adapter is None:
+            self._list_adapter = type_adapter(List[self.typ])  # type: ignore
+        return self._list_adapter.validate_python(values)
@@ -12,6 +12,7 @@ from tenacity import (
 logger = get_logger(__name__)
 try:
     import redis
+    import redis.asyncio
 except ImportError:  # pragma: no cover
     logger.debug("Redis is not available " "(install optimx[redis] or redis)")
 
@@ -54,3 +55,11 @@ def connect_redis(host, port):
     if not redis_cache.ping():
         raise ConnectionError("Cannot connect to redis")
     return redis_cache
+
+
+def async_redis_client(host, port, max_connections=None):
+    """
+    Create a `redis.asyncio` client with its own connection pool. Connections
+    are opened lazily, the first time the client is awaited.
+    """
+    return redis.asyncio.Redis(host=host, port=port, max_connections=max_connections)
@@ -0,0 +1,68 @@
+import concurrent.futures
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+from optimx.utils.cache_keys import PickleKeyBuilder
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same keys.
+
+    The first caller to `join` a key leads its computation, and later callers
+    get a future that is resolved with the leader's result (or exception).
+    Futures are `concurrent.futures.Future`s, so they can be waited on from
+    threads, or awaited from asyncio tasks with `asyncio.wrap_future`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[bytes, concurrent.futures.Future] = {}
+        self._key_builder = PickleKeyBuilder()
+        self.led = 0
+        self.coalesced = 0
+
+    def __reduce__(self):
+        # in-flight computations are not shared with copies of the model
+        return (SingleFlight, ())
+
+    def hash_key(self, model_key: str, item: Any, kwargs: Dict[str, Any]) -> bytes:
+        """Key used when the model has no cache to provide one"""
+        return self._key_builder.hash(model_key.encode(), item, kwargs)
+
+    def join(
+        self, keys: Sequence[bytes]
+    ) -> Tuple[List[int], Dict[int, concurrent.futures.Future]]:
+        """
+        Returns the indices of the keys the caller has to compute, and the
+        futures of the keys that are already being computed.
+        The caller must `resolve` or `reject` all the keys it leads.
+        """
+        led: List[int] = []
+        followed: Dict[int, concurrent.futures.Future] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                future = self._calls.get(key)
+                if future is None:
+                    self._calls[key] = concurrent.futures.Future()
+                    led.append(i)
+                else:
+                    followed[i] = future
+            self.led += len(led)
+            self.coalesced += len(followed)
+        return led, followed
+
+    def resolve(self, keys: Sequence[bytes], values: Sequence[Any]):
+        with self._lock:
+            futures = [self._calls.pop(key) for key in keys]
+        for future, value in zip(futures, values):
+            future.set_result(value)
+
+    def reject(self, keys: Sequence[bytes], exc: BaseException):
+        with self._lock:
+            futures = [self._calls.pop(key) for key in keys]
+        for future in futures:
+            future.set_exception(exc)
+
+    def stats(self) -> Dict[str, int]:
+        return {"led": self.led, "coalesced": self.coalesced}
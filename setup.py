@@ -34,6 +34,13 @@ setup(
         "netifaces",
         "argparse",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+        "orjson": ["orjson"],
+        "msgpack": ["msgpack"],
+        "pyarrow": ["pyarrow", "numpy"],
+        "xxhash": ["xxhash", "orjson"],
+    },
     test_suite="tests",
     tests_require=["unittest2"],
     entry_points={
@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip("orjson")
+
+from optimx.utils.cache_keys import CanonicalKeyBuilder  # noqa: E402
+
+
+@pytest.fixture
+def key():
+    builder = CanonicalKeyBuilder()
+    return lambda item, kwargs=None: builder.hash(b"model", item, kwargs or {})
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ({"x": math.nan}, {"x": None}),
+        ({"x": math.inf}, {"x": None}),
+        ({"x": math.inf}, {"x": -math.inf}),
+        ({"x": {"a", "b"}}, {"x": ["a", "b"]}),
+        ({"x": (1, 2)}, {"x": [1, 2]}),
+        ({1: "a"}, {"1": "a"}),
+        ({"x": np.array([1, 2])}, {"x": [1, 2]}),
+        ({"x": np.array([1, 2], dtype=np.int32)}, {"x": np.array([1, 2])}),
+        ({"x": b"ab"}, {"x": "ab"}),
+        ({"x": 2**70}, {"x": str(2**70)}),
+        ({"x": {"\x00set": ["a"]}}, {"x": {"a"}}),
+        ("ab", b"ab"),
+    ],
+)
+def test_canonical_keys_do_not_collide(key, a, b):
+    assert key(a) != key(b)
+
+
+def test_canonical_keys_kwargs_do_not_collide(key):
+    assert key("a", {"x": math.nan}) != key("a", {"x": None})
+    assert key("a", {"x": 1}) != key("a")
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        {"x": 2**70, "y": -(2**70)},
+        {"x": math.nan, "y": [math.inf, -math.inf]},
+        {"x": {3, 1, 2}, "y": frozenset({"a"})},
+        {(1, 2): "a", 3: "b"},
+        {"x": np.arange(6).reshape((2, 3))},
+        {"x": np.array(["a", None], dtype=object)},
+        {"x": np.float32(1.5), "y": np.int64(3)},
+    ],
+)
+def test_canonical_keys_are_stable(key, item):
+    assert key(item) == key(item)
+
+
+def test_canonical_keys_ignore_order(key):
+    assert key({"a": 1, "b": 2}) == key({"b": 2, "a": 1})
+    assert key({"x": {3, 1, 2}}) == key({"x": {2, 3, 1}})
+    assert key({1: "a", 2: "b"}) == key({2: "b", 1: "a"})
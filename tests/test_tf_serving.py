@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+pytest.importorskip("grpc")
+pytest.importorskip("tensorflow_serving")
+
+from tensorflow.core.framework.tensor_pb2 import TensorProto  # noqa: E402
+
+from optimx.core.models.tensorflow_model import (  # noqa: E402
+    TensorflowModel,
+    array_to_tensor_proto,
+    tensor_proto_to_array,
+)
+from optimx.core.settings import LibrarySettings  # noqa: E402
+from optimx.testing.tf_serving import tf_serving_stand_in  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.arange(6, dtype=np.float32).reshape((2, 3)),
+        np.arange(4, dtype=np.int64),
+        np.array([[True, False]]),
+        np.array([b"a", b"bc"]),
+    ],
+)
+def test_tensor_proto_round_trip(array):
+    proto = TensorProto()
+    array_to_tensor_proto(array, proto)
+    decoded = tensor_proto_to_array(proto)
+    np.testing.assert_array_equal(decoded, array)
+    assert decoded.flags.writeable
+
+
+@pytest.fixture
+def tf_serving_port():
+    server, port = tf_serving_stand_in(
+        lambda model_name, inputs: {"output": inputs["input"] * 2}
+    )
+    yield port
+    server.stop(None)
+
+
+def test_tf_serving_grpc_round_trip(tf_serving_port):
+    model = TensorflowModel(
+        configuration_key="doubler",
+        service_settings=LibrarySettings(
+            tf_serving={
+                "enable": True,
+                "mode": "grpc",
+                "host": "localhost",
+                "port": tf_serving_port,
+            }
+        ),
+        model_settings={
+            "output_tensor_mapping": {"output": "output"},
+            "output_shapes": {"output": (3,)},
+            "output_dtypes": {"output": np.float32},
+        },
+    )
+    items = [{"input": np.arange(3, dtype=np.float32) + i} for i in range(4)]
+    predictions = model.predict_batch(items)
+    for item, prediction in zip(items, predictions):
+        np.testing.assert_array_equal(prediction["output"], item["input"] * 2)
+        # predictions are writable arrays
+        prediction["output"][0] = 0